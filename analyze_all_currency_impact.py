@@ -0,0 +1,18 @@
+"""
+Analyze Currency Impact for All Markets
+
+Runs the US and Indian currency impact analyses in a single process so
+pandas/matplotlib are imported only once.
+"""
+
+import analyze_currency_impact
+import analyze_indian_currency_impact
+
+def main():
+    """Run every currency impact analysis"""
+    analyze_currency_impact.main()
+    print()
+    analyze_indian_currency_impact.main()
+
+if __name__ == "__main__":
+    main()
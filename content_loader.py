@@ -1,7 +1,9 @@
 import os
 import re
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from fastapi import Request
 
 # Supported languages
@@ -12,24 +14,75 @@ LANGUAGES = {
 
 DEFAULT_LANGUAGE = 'en'
 
+# Thread count used to read content files in parallel at startup
+_CONTENT_LOAD_WORKERS = 8
+
+_LANGUAGE_SET = frozenset(LANGUAGES)
+_RTL_LANGUAGES = frozenset(['he', 'ar', 'fa', 'ur'])
+
+# Primary language subtag of each Accept-Language range, e.g. "he" in "he-IL;q=0.9"
+_ACCEPT_LANGUAGE_RE = re.compile(r'(?:^|,)\s*([A-Za-z]+)')
+
+# Matches "# Title" and "## Section" header lines
+_HEADER_RE = re.compile(r'^[ \t]*(#{1,2}) +(.*)$', re.MULTILINE)
+
 class ContentLoader:
     def __init__(self):
         self.content_cache = {}
+        # {lang: {"page": page_dict, "page.key": value}} for O(1) template lookups
+        self.flat_cache = {}
         self.content_dir = Path("content")
         self._load_all_content()
+        # Helpers only hold (loader, language), so one per language suffices
+        self._helpers = {lang: ContentHelper(self, lang) for lang in LANGUAGES}
+        # Template language contexts depend only on the language. Helpers
+        # read flat_cache live, so these stay valid across reload_content().
+        self._language_contexts = {lang: self._build_language_context(lang) for lang in LANGUAGES}
     
     def _load_all_content(self):
         """Load all markdown content into memory for fast access"""
         print("Loading content files...")
+        md_files = []
         for lang in LANGUAGES.keys():
             lang_dir = self.content_dir / lang
             if lang_dir.exists():
                 self.content_cache[lang] = {}
-                for md_file in lang_dir.glob("*.md"):
-                    file_name = md_file.stem
-                    content = self._parse_markdown_file(md_file)
-                    self.content_cache[lang][file_name] = content
-                    print(f"Loaded {lang}/{file_name}.md with {len(content)} keys")
+                md_files.extend((lang, md_file) for md_file in lang_dir.glob("*.md"))
+        
+        # Overlap file reads across a small thread pool; results come back in
+        # submission order so the load log stays deterministic
+        with ThreadPoolExecutor(max_workers=_CONTENT_LOAD_WORKERS) as executor:
+            parsed = executor.map(self._parse_markdown_file, [md_file for _, md_file in md_files])
+            for (lang, md_file), content in zip(md_files, parsed):
+                file_name = md_file.stem
+                self.content_cache[lang][file_name] = content
+                print(f"Loaded {lang}/{file_name}.md with {len(content)} keys")
+        self._build_flat_cache()
+    
+    def _build_flat_cache(self):
+        """Flatten content_cache into one dotted-key dict per language"""
+        self.flat_cache = {}
+        for lang, pages in self.content_cache.items():
+            flat = {}
+            for page, page_content in pages.items():
+                flat[page] = page_content
+                self._flatten_into(flat, page, page_content)
+            self.flat_cache[lang] = flat
+        
+        # Languages without content fall back to the default language
+        default_flat = self.flat_cache.get(DEFAULT_LANGUAGE, {})
+        for lang in LANGUAGES:
+            if not self.flat_cache.get(lang):
+                self.flat_cache[lang] = default_flat
+    
+    @classmethod
+    def _flatten_into(cls, flat: Dict[str, Any], prefix: str, content: Dict[str, Any]):
+        """Add "prefix.key" entries for content, recursing into nested dicts"""
+        for key, value in content.items():
+            dotted_key = f"{prefix}.{key}"
+            flat[dotted_key] = value
+            if isinstance(value, dict):
+                cls._flatten_into(flat, dotted_key, value)
     
     def reload_content(self):
         """Reload all content from disk - useful during development"""
@@ -44,91 +97,80 @@ class ContentLoader:
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
             
-            # Simple flat structure for easy template access
-            result = {}
-            current_section = None
+            # Simple flat structure for easy template access. Splitting on
+            # the header regex yields [preamble, hashes, title, body, ...]
+            sections: Dict[str, List[str]] = defaultdict(list)
+            parts = _HEADER_RE.split(content)
             
-            lines = content.split('\n')
+            # Text before any section header goes to 'content'
+            self._append_lines(sections['content'], parts[0])
+            current_section = 'content'
             
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
+            for i in range(1, len(parts), 3):
+                hashes, title, body = parts[i:i + 3]
+                title = title.strip()
                 
-                # Main headers (# Title) 
-                if line.startswith('# '):
-                    result['page_title'] = line[2:].strip()
+                # Main headers (# Title)
+                if title and hashes == '#':
+                    sections['page_title'] = [title]
                     
                 # Section headers (## Section)
-                elif line.startswith('## '):
-                    current_section = line[3:].strip().lower().replace(' ', '_').replace('-', '_')
-                    
-                # Direct content after sections
-                elif current_section and line and not line.startswith('#'):
-                    # Create section key if it doesn't exist
-                    section_key = current_section
-                    if section_key not in result:
-                        result[section_key] = line
-                    else:
-                        # Append to existing content
-                        result[section_key] += '\\n' + line
+                elif title:
+                    current_section = title.lower().replace(' ', '_').replace('-', '_')
                 
-                # No section - direct mapping
-                elif not line.startswith('#'):
-                    if 'content' not in result:
-                        result['content'] = line
-                    else:
-                        result['content'] += '\\n' + line
+                self._append_lines(sections[current_section], body)
             
-            return result
+            return {key: '\n'.join(lines) for key, lines in sections.items() if lines}
             
         except Exception as e:
             print(f"Error parsing {file_path}: {e}")
             return {}
     
+    @staticmethod
+    def _append_lines(buffer: List[str], text: str):
+        """Append the non-empty, non-header lines of text to buffer"""
+        for line in text.split('\n'):
+            line = line.strip()
+            if line and not line.startswith('#'):
+                buffer.append(line)
+    
     def get_content(self, language: str, page: str, key: str = None, default: str = "") -> Any:
-        """Get content for a specific language, page, and key"""
-        lang_content = self.content_cache.get(language)
-        if not lang_content:
-            # Fallback to default language
-            lang_content = self.content_cache.get(DEFAULT_LANGUAGE, {})
-        
-        page_content = lang_content.get(page, {})
+        """Get content for a specific language, page, and key
         
+        Nested keys like "hero_section.main_title" are resolved from the
+        flattened cache in a single lookup.
+        """
+        flat = self.flat_cache.get(language) or self.flat_cache.get(DEFAULT_LANGUAGE, {})
         if key is None:
-            return page_content
-        
-        # Handle nested keys like "hero_section.main_title"
-        if '.' in key:
-            keys = key.split('.')
-            result = page_content
-            for k in keys:
-                if isinstance(result, dict):
-                    result = result.get(k, default)
-                else:
-                    return default
-            return result
-        
-        return page_content.get(key, default)
+            return flat.get(page, {})
+        return flat.get(f"{page}.{key}", default)
     
     def get_language_from_request(self, request: Request) -> str:
-        """Detect language from request (same as before)"""
+        """Detect language from request, cached on request.state"""
+        lang = getattr(request.state, 'language', None)
+        if lang is None:
+            lang = self._detect_language(request)
+            request.state.language = lang
+        return lang
+    
+    def _detect_language(self, request: Request) -> str:
+        """Detect language from query parameter, cookie or Accept-Language"""
         # 1. Check query parameter
         lang = request.query_params.get('lang')
-        if lang and lang in LANGUAGES:
+        if lang in _LANGUAGE_SET:
             return lang
         
         # 2. Check cookie
         lang = request.cookies.get('language')
-        if lang and lang in LANGUAGES:
+        if lang in _LANGUAGE_SET:
             return lang
         
         # 3. Check browser Accept-Language header
         accept_language = request.headers.get('accept-language')
         if accept_language:
-            for lang_range in accept_language.split(','):
-                lang = lang_range.strip().split(';')[0].split('-')[0].lower()
-                if lang in LANGUAGES:
+            for match in _ACCEPT_LANGUAGE_RE.finditer(accept_language):
+                lang = match.group(1).lower()
+                if lang in _LANGUAGE_SET:
                     return lang
         
         # 4. Default to English
@@ -136,19 +178,25 @@ class ContentLoader:
     
     def is_rtl_language(self, language: str) -> bool:
         """Check if language requires RTL layout"""
-        rtl_languages = ['he', 'ar', 'fa', 'ur']
-        return language in rtl_languages
+        return language in _RTL_LANGUAGES
     
     def get_language_context(self, request: Request) -> Dict[str, Any]:
         """Get language context for template rendering"""
-        current_lang = self.get_language_from_request(request)
+        return dict(self.get_language_context_by_lang(self.get_language_from_request(request)))
+    
+    def get_language_context_by_lang(self, language: str) -> Dict[str, Any]:
+        """Prebuilt language context for a supported language; shared, so don't mutate it"""
+        return self._language_contexts[language]
+    
+    def _build_language_context(self, language: str) -> Dict[str, Any]:
+        is_rtl = language in _RTL_LANGUAGES
         
         return {
-            'current_language': current_lang,
-            'is_rtl': self.is_rtl_language(current_lang),
+            'current_language': language,
+            'is_rtl': is_rtl,
             'languages': LANGUAGES,
-            'dir': 'rtl' if self.is_rtl_language(current_lang) else 'ltr',
-            'content': ContentHelper(self, current_lang)
+            'dir': 'rtl' if is_rtl else 'ltr',
+            'content': self._helpers[language]
         }
 
 class ContentHelper:
@@ -159,47 +207,63 @@ class ContentHelper:
     
     def get(self, page: str, key: str = None, default: str = "") -> Any:
         """Simplified content access for templates"""
-        return self.loader.get_content(self.language, page, key, default)
+        if key is None:
+            return self.loader.flat_cache[self.language].get(page, {})
+        return self.loader.flat_cache[self.language].get(f"{page}.{key}", default)
     
     def nav(self, key: str, default: str = "") -> str:
         """Quick access to navigation content"""
-        return self.loader.get_content(self.language, 'navigation', key, default)
+        return self.loader.flat_cache[self.language].get('navigation.' + key, default)
     
     def home(self, key: str, default: str = "") -> str:
         """Quick access to homepage content"""  
-        return self.loader.get_content(self.language, 'homepage', key, default)
+        return self.loader.flat_cache[self.language].get('homepage.' + key, default)
     
     def footer(self, key: str, default: str = "") -> str:
         """Quick access to footer content"""
-        return self.loader.get_content(self.language, 'footer', key, default)
+        return self.loader.flat_cache[self.language].get('footer.' + key, default)
     
     def methodology(self, key: str, default: str = "") -> str:
         """Quick access to methodology content"""
-        return self.loader.get_content(self.language, 'methodology', key, default)
+        return self.loader.flat_cache[self.language].get('methodology.' + key, default)
     
     def education(self, key: str, default: str = "") -> str:
         """Quick access to education content"""
-        return self.loader.get_content(self.language, 'education', key, default)
+        return self.loader.flat_cache[self.language].get('education.' + key, default)
     
     def pricing(self, key: str, default: str = "") -> str:
         """Quick access to pricing content"""
-        return self.loader.get_content(self.language, 'pricing', key, default)
+        return self.loader.flat_cache[self.language].get('pricing.' + key, default)
     
     def faq(self, key: str, default: str = "") -> str:
         """Quick access to FAQ content"""
-        return self.loader.get_content(self.language, 'faq', key, default)
+        return self.loader.flat_cache[self.language].get('faq.' + key, default)
     
     def support(self, key: str, default: str = "") -> str:
         """Quick access to support content"""
-        return self.loader.get_content(self.language, 'support', key, default)
+        return self.loader.flat_cache[self.language].get('support.' + key, default)
     
     def legal_disclaimers(self, key: str, default: str = "") -> str:
         """Quick access to legal disclaimers content"""
-        return self.loader.get_content(self.language, 'legal-disclaimers', key, default)
+        return self.loader.flat_cache[self.language].get('legal-disclaimers.' + key, default)
     
     def risk_assessment(self, key: str, default: str = "") -> str:
         """Quick access to risk assessment content"""
-        return self.loader.get_content(self.language, 'risk-assessment', key, default)
+        return self.loader.flat_cache[self.language].get('risk-assessment.' + key, default)
+
+# Global content loader instance, created on first use
+_content_loader: Optional[ContentLoader] = None
+
+def get_content_loader() -> ContentLoader:
+    """Return the shared ContentLoader, loading content on first call"""
+    global _content_loader
+    if _content_loader is None:
+        _content_loader = ContentLoader()
+    return _content_loader
 
-# Global content loader instance
-content_loader = ContentLoader()
\ No newline at end of file
+def __getattr__(name: str) -> Any:
+    # Keep `from content_loader import content_loader` working without
+    # paying the markdown load cost at import time
+    if name == 'content_loader':
+        return get_content_loader()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,229 @@
+"""
+Currency Impact Analysis Core
+
+Shared implementation behind the analyze_*_currency_impact scripts. Shows the
+cumulative performance of foreign equities in local currency terms vs ILS terms
+and the FX rate to understand the currency conversion impact.
+"""
+
+import functools
+import pandas as pd
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from pathlib import Path
+from price_loader import read_price_file
+import warnings
+warnings.filterwarnings('ignore')
+
+DATA_PATH = Path("processed_data")
+
+@functools.lru_cache(maxsize=None)
+def load_and_process_data(asset_files, fx_file):
+    """Load price data for a tuple of asset files plus their FX rate
+
+    Returns a (dates x assets) price DataFrame and the FX rate Series.
+    Cached per (asset_files, fx_file), so treat the result as read-only.
+    """
+    equity_data = pd.concat({
+        asset_file.replace('clean_', '').replace('.csv', ''): read_price_file(DATA_PATH / asset_file, 'price')
+        for asset_file in asset_files
+    }, axis=1, join='outer')
+
+    fx_rate = read_price_file(DATA_PATH / fx_file, 'fx_rate')
+
+    return equity_data, fx_rate
+
+def calculate_cumulative_returns(prices):
+    """Calculate cumulative returns normalized to start at 1
+
+    Works on a Series or a DataFrame of prices; the first row is divided
+    out in place on a single float64 buffer.
+    """
+    values = prices.to_numpy(dtype=np.float64, copy=True)
+    values /= values[0]
+    if isinstance(prices, pd.DataFrame):
+        return pd.DataFrame(values, index=prices.index, columns=prices.columns)
+    return pd.Series(values, index=prices.index, name=prices.name)
+
+def cumulative_to_percent(curve):
+    """Convert a normalized cumulative curve to a % change ndarray for plotting"""
+    values = curve.to_numpy(dtype=np.float64, copy=True)
+    values -= 1
+    values *= 100
+    return values
+
+def analyze(asset_files, fx_file, base_ccy, quote_ccy, periods_per_year, out_png,
+            market, highlight_asset, highlight_label, fx_decimals=3):
+    """Create comprehensive currency impact analysis for one market
+
+    Args:
+        asset_files: Processed CSV files of the market's equities
+        fx_file: Processed CSV of the base/quote FX rate
+        base_ccy: Currency the equities are priced in, e.g. 'USD'
+        quote_ccy: Currency to convert into, e.g. 'ILS'
+        periods_per_year: Observations per year, used to annualize returns
+        out_png: Path of the chart to write
+        market: Market name used in titles, e.g. 'US'
+        highlight_asset: Asset shown in the currency impact panel
+        highlight_label: Display name of highlight_asset
+        fx_decimals: Decimals used when printing FX rates
+    """
+
+    print(f"Loading {market} data...")
+    equity_data, fx_rate = load_and_process_data(tuple(asset_files), fx_file)
+
+    # Align all data to common dates in a single inner join, FX included
+    aligned = equity_data.join(fx_rate.rename('fx'), how='inner').dropna()
+    common_dates = aligned.index
+
+    aligned_fx = aligned['fx']
+    aligned_equity = aligned.drop(columns='fx')
+
+    print(f"Data period: {common_dates[0]} to {common_dates[-1]}")
+    print(f"Number of observations: {len(common_dates)}")
+
+    fx_label = f'{base_ccy}/{quote_ccy} Rate'
+
+    # Calculate returns for each asset
+    # Render straight to an Agg canvas, bypassing pyplot's global figure state
+    fig = Figure(figsize=(15, 12))
+    FigureCanvasAgg(fig)
+    axes = fig.subplots(2, 2)
+    fig.suptitle(f'{market} Equity Performance: {base_ccy} vs {quote_ccy} Impact Analysis',
+                 fontsize=16, fontweight='bold')
+
+    # Plot 1: FX rate
+    ax1 = axes[0, 0]
+    fx_cumulative = calculate_cumulative_returns(aligned_fx)
+    ax1.plot(fx_cumulative.index, fx_cumulative.values, 'red', linewidth=2, rasterized=True, label=fx_label)
+    ax1.set_title(f'{base_ccy}/{quote_ccy} Exchange Rate (Normalized)', fontweight='bold')
+    ax1.set_ylabel('Cumulative Change')
+    ax1.grid(True, alpha=0.3)
+    ax1.legend()
+
+    # Calculate percentage change
+    fx_total_change = (fx_cumulative.iloc[-1] - 1) * 100
+    ax1.text(0.02, 0.95, f'Total Change: {fx_total_change:+.1f}%',
+             transform=ax1.transAxes, bbox=dict(boxstyle="round,pad=0.3", facecolor="yellow", alpha=0.7))
+
+    # Show actual FX rate values
+    start_rate = aligned_fx.iloc[0]
+    end_rate = aligned_fx.iloc[-1]
+    ax1.text(0.02, 0.85, f'Start: {start_rate:.{fx_decimals}f} {quote_ccy}/{base_ccy}',
+             transform=ax1.transAxes, bbox=dict(boxstyle="round,pad=0.3", facecolor="lightblue", alpha=0.7))
+    ax1.text(0.02, 0.75, f'End: {end_rate:.{fx_decimals}f} {quote_ccy}/{base_ccy}',
+             transform=ax1.transAxes, bbox=dict(boxstyle="round,pad=0.3", facecolor="lightblue", alpha=0.7))
+
+    # Plot 2: Equities in base currency terms
+    ax2 = axes[0, 1]
+    colors = ['blue', 'green', 'purple']
+
+    # Normalize all assets at once, in local and quote currency terms
+    base_performance = calculate_cumulative_returns(aligned_equity)
+    # Convert to quote currency: multiply prices by FX rate
+    quote_prices = aligned_equity.mul(aligned_fx, axis=0)
+    quote_performance = calculate_cumulative_returns(quote_prices)
+
+    for i, asset_name in enumerate(base_performance.columns):
+        base_cumulative = base_performance[asset_name]
+        ax2.plot(base_cumulative.index, base_cumulative.values,
+                colors[i % len(colors)], linewidth=2, rasterized=True, label=asset_name.replace('_', ' '))
+
+        # Show total return
+        total_return = (base_cumulative.iloc[-1] - 1) * 100
+        print(f"{asset_name} {base_ccy} return: {total_return:.1f}%")
+
+    ax2.set_title(f'{market} Equities Performance ({base_ccy} Terms)', fontweight='bold')
+    ax2.set_ylabel('Cumulative Return')
+    ax2.grid(True, alpha=0.3)
+    ax2.legend()
+
+    # Plot 3: Equities in quote currency terms
+    ax3 = axes[1, 0]
+
+    for i, asset_name in enumerate(quote_performance.columns):
+        quote_cumulative = quote_performance[asset_name]
+        ax3.plot(quote_cumulative.index, quote_cumulative.values,
+                colors[i % len(colors)], linewidth=2, rasterized=True, label=asset_name.replace('_', ' '))
+
+        # Show total return
+        total_return = (quote_cumulative.iloc[-1] - 1) * 100
+        print(f"{asset_name} {quote_ccy} return: {total_return:.1f}%")
+
+    ax3.set_title(f'{market} Equities Performance ({quote_ccy} Terms)', fontweight='bold')
+    ax3.set_ylabel('Cumulative Return')
+    ax3.grid(True, alpha=0.3)
+    ax3.legend()
+
+    # Plot 4: Currency Impact Comparison
+    ax4 = axes[1, 1]
+
+    # Show the difference for the highlighted asset as example
+    if highlight_asset in base_performance:
+        base_curve = base_performance[highlight_asset]
+        quote_curve = quote_performance[highlight_asset]
+
+        ax4.plot(base_curve.index, cumulative_to_percent(base_curve), 'blue', linewidth=2, rasterized=True, label=f'{highlight_label} ({base_ccy})')
+        ax4.plot(quote_curve.index, cumulative_to_percent(quote_curve), 'red', linewidth=2, rasterized=True, label=f'{highlight_label} ({quote_ccy})')
+        ax4.plot(fx_cumulative.index, cumulative_to_percent(fx_cumulative), 'orange', linewidth=2, rasterized=True, label=fx_label, alpha=0.7)
+
+        # Calculate currency drag
+        base_final = (base_curve.iloc[-1] - 1) * 100
+        quote_final = (quote_curve.iloc[-1] - 1) * 100
+        currency_drag = quote_final - base_final
+
+        ax4.set_title(f'Currency Impact on {highlight_label} Returns', fontweight='bold')
+        ax4.set_ylabel('Cumulative Return (%)')
+        ax4.grid(True, alpha=0.3)
+        ax4.legend()
+
+        # Add text box with currency drag
+        ax4.text(0.02, 0.95, f'Currency Drag: {currency_drag:+.1f}%',
+                transform=ax4.transAxes, bbox=dict(boxstyle="round,pad=0.3", facecolor="lightcoral", alpha=0.8))
+
+    fig.tight_layout()
+    fig.savefig(out_png, dpi=150)
+    print(f"Chart saved as '{out_png}'")
+
+    # Summary statistics
+    print("\n" + "="*80)
+    print(f"{market.upper()} CURRENCY IMPACT SUMMARY")
+    print("="*80)
+
+    print(f"\n{base_ccy}/{quote_ccy} Exchange Rate:")
+    print(f"  Start: {aligned_fx.iloc[0]:.{fx_decimals}f} {quote_ccy} per {base_ccy}")
+    print(f"  End: {aligned_fx.iloc[-1]:.{fx_decimals}f} {quote_ccy} per {base_ccy}")
+    print(f"  Total Change: {fx_total_change:+.1f}%")
+
+    if fx_total_change > 0:
+        print(f"  -> {base_ccy} STRENGTHENED vs {quote_ccy} (good for {market} equity returns in {quote_ccy})")
+    else:
+        print(f"  -> {base_ccy} WEAKENED vs {quote_ccy} (bad for {market} equity returns in {quote_ccy})")
+
+    print(f"\n{market} Equity Performance Comparison:")
+    # Total returns for all assets at once from the last row
+    base_total = base_performance.iloc[-1] - 1
+    quote_total = quote_performance.iloc[-1] - 1
+    base_ret = base_total * 100
+    quote_ret = quote_total * 100
+    drag = quote_ret - base_ret
+
+    for asset_name in aligned_equity.columns:
+        print(f"  {asset_name.replace('_', ' ')}:")
+        print(f"    {base_ccy} Return: {base_ret[asset_name]:+.1f}%")
+        print(f"    {quote_ccy} Return: {quote_ret[asset_name]:+.1f}%")
+        print(f"    Currency Impact: {drag[asset_name]:+.1f}%")
+
+    # Calculate annualized returns
+    years = len(common_dates) / periods_per_year
+    print(f"\nAnnualized Returns (over {years:.1f} years):")
+    # (1 + total)**(1/years) - 1 for all assets in one vectorized pass
+    with np.errstate(divide='ignore', invalid='ignore'):
+        base_annual = np.expm1(np.log1p(base_total) / years)
+        quote_annual = np.expm1(np.log1p(quote_total) / years)
+
+    for asset_name in aligned_equity.columns:
+        print(f"  {asset_name.replace('_', ' ')}:")
+        print(f"    {base_ccy}: {base_annual[asset_name]:.1%} annually")
+        print(f"    {quote_ccy}: {quote_annual[asset_name]:.1%} annually")
@@ -7,6 +7,15 @@ Compare the different stages of data processing to find where returns are gettin
 import pandas as pd
 import numpy as np
 from pathlib import Path
+from price_loader import read_price_file
+
+def compound_rate(rate, periods):
+    """(1 + rate)**periods - 1, via log1p/expm1 to stay accurate for small rates
+
+    Works elementwise on arrays, e.g. periods=1/12 turns annual rates into
+    monthly ones and periods=12 annualizes a monthly rate.
+    """
+    return np.expm1(np.log1p(rate) * periods)
 
 def analyze_data_pipeline():
     """Analyze each step of the data processing pipeline"""
@@ -25,16 +34,10 @@ def analyze_data_pipeline():
     fx_file = data_path / 'clean_USD_ILS_FX.csv'
     
     # Load SP500 prices
-    sp500_df = pd.read_csv(sp500_file)
-    sp500_df.columns = ['date', 'price']
-    sp500_df['date'] = pd.to_datetime(sp500_df['date'])
-    sp500_df = sp500_df.set_index('date').sort_index()
+    sp500_df = read_price_file(sp500_file, 'price').to_frame()
     
     # Load FX rate
-    fx_df = pd.read_csv(fx_file)
-    fx_df.columns = ['date', 'fx_rate']
-    fx_df['date'] = pd.to_datetime(fx_df['date'])
-    fx_df = fx_df.set_index('date').sort_index()
+    fx_df = read_price_file(fx_file, 'fx_rate').to_frame()
     
     print(f"SP500 price data:")
     print(f"  Period: {sp500_df.index[0]} to {sp500_df.index[-1]}")
@@ -45,7 +48,7 @@ def analyze_data_pipeline():
     # Calculate raw price return
     total_price_return = (sp500_df['price'].iloc[-1] / sp500_df['price'].iloc[0]) - 1
     years = (sp500_df.index[-1] - sp500_df.index[0]).days / 365.25
-    annualized_return = (1 + total_price_return)**(1/years) - 1
+    annualized_return = compound_rate(total_price_return, 1/years)
     
     print(f"  Total return: {total_price_return:.1%}")
     print(f"  Years: {years:.1f}")
@@ -67,7 +70,7 @@ def analyze_data_pipeline():
     
     # Annualize from monthly returns
     mean_monthly = sp500_returns.mean()
-    annualized_from_monthly = (1 + mean_monthly)**12 - 1
+    annualized_from_monthly = compound_rate(mean_monthly, 12)
     print(f"  Annualized (compound): {annualized_from_monthly:.1%}")
     print(f"  Annualized (simple): {mean_monthly * 12:.1%}")
     
@@ -75,10 +78,9 @@ def analyze_data_pipeline():
     print(f"\n3. CURRENCY CONVERSION ANALYSIS")
     print("-" * 40)
     
-    # Align dates
-    common_dates = sp500_df.index.intersection(fx_df.index)
-    sp500_aligned = sp500_df.loc[common_dates]
-    fx_aligned = fx_df.loc[common_dates]
+    # Align dates with one sorted-index inner join (both frames are date ordered)
+    aligned = sp500_df[['price']].join(fx_df, how='inner')
+    fx_aligned = aligned[['fx_rate']]
     
     print(f"FX rate data:")
     print(f"  Period: {fx_aligned.index[0]} to {fx_aligned.index[-1]}")
@@ -88,15 +90,17 @@ def analyze_data_pipeline():
     fx_change = (fx_aligned['fx_rate'].iloc[-1] / fx_aligned['fx_rate'].iloc[0]) - 1
     print(f"  FX change: {fx_change:.1%}")
     
-    # Convert to ILS prices
-    ils_prices = sp500_aligned['price'] * fx_aligned['fx_rate']
-    ils_total_return = (ils_prices.iloc[-1] / ils_prices.iloc[0]) - 1
-    ils_years = (ils_prices.index[-1] - ils_prices.index[0]).days / 365.25
-    ils_annualized = (1 + ils_total_return)**(1/ils_years) - 1
+    # Convert to ILS prices; both columns come from one aligned frame, so
+    # multiply the raw arrays with no index alignment
+    ils_dates = aligned.index
+    ils_prices = np.multiply(aligned['price'].to_numpy(), aligned['fx_rate'].to_numpy())
+    ils_total_return = (ils_prices[-1] / ils_prices[0]) - 1
+    ils_years = (ils_dates[-1] - ils_dates[0]).days / 365.25
+    ils_annualized = compound_rate(ils_total_return, 1/ils_years)
     
     print(f"ILS conversion:")
-    print(f"  Start ILS price: {ils_prices.iloc[0]:.2f}")
-    print(f"  End ILS price: {ils_prices.iloc[-1]:.2f}")
+    print(f"  Start ILS price: {ils_prices[0]:.2f}")
+    print(f"  End ILS price: {ils_prices[-1]:.2f}")
     print(f"  Total ILS return: {ils_total_return:.1%}")
     print(f"  Annualized ILS return: {ils_annualized:.1%}")
     
@@ -104,35 +108,41 @@ def analyze_data_pipeline():
     print(f"\n4. SYSTEM CALCULATION COMPARISON")
     print("-" * 40)
     
-    # Simulate our ILS data manager calculation
-    ils_monthly_returns = ils_prices.pct_change().dropna()
+    # Simulate our ILS data manager calculation: period returns straight
+    # from the ILS price buffer, p[t] / p[t-1] - 1
+    ils_returns = np.divide(ils_prices[1:], ils_prices[:-1])
+    ils_returns -= 1.0
+    ils_monthly_returns = pd.Series(ils_returns, index=ils_dates[1:]).dropna()
     
     # Load risk-free rate
     rf_file = data_path / 'clean_Risk_Free_Rate_Israel.csv'
-    rf_df = pd.read_csv(rf_file)
-    rf_df.columns = ['date', 'rate']
-    rf_df['date'] = pd.to_datetime(rf_df['date'])
-    rf_df = rf_df.set_index('date').sort_index()
+    rf_df = read_price_file(rf_file, 'rate').to_frame()
     
-    # Align risk-free rate
-    rf_aligned = rf_df.loc[ils_monthly_returns.index[0]:ils_monthly_returns.index[-1]]
-    rf_aligned = rf_aligned.reindex(ils_monthly_returns.index, method='ffill')
+    # Align risk-free rate: latest rate on or before each return date
+    rf_window = rf_df.loc[ils_monthly_returns.index[0]:ils_monthly_returns.index[-1]]
+    rf_aligned = pd.merge_asof(
+        ils_monthly_returns.index.to_frame(index=False, name='date'),
+        rf_window.reset_index(),
+        on='date', direction='backward'
+    ).set_index('date')
     
-    # Convert annual RF to monthly
-    monthly_rf = (1 + rf_aligned['rate'])**(1/12) - 1
+    # Convert annual RF to monthly. rf_aligned shares the returns' index, so
+    # work on raw arrays and skip pandas index alignment; nanmean matches
+    # pandas' skipna for dates before the first RF observation
+    monthly_rf = compound_rate(rf_aligned['rate'].to_numpy(), 1/12)
     
     print(f"Risk-free rate analysis:")
     print(f"  RF observations: {len(rf_aligned)}")
     print(f"  RF mean annual: {rf_aligned['rate'].mean():.2%}")
-    print(f"  RF mean monthly: {monthly_rf.mean():.4f}")
+    print(f"  RF mean monthly: {np.nanmean(monthly_rf):.4f}")
     
     # Calculate excess returns
-    excess_returns = ils_monthly_returns - monthly_rf
+    excess_returns = ils_monthly_returns.to_numpy() - monthly_rf
     
     print(f"Excess returns:")
-    print(f"  Mean monthly excess: {excess_returns.mean():.4f}")
-    print(f"  Annualized excess: {excess_returns.mean() * 12:.1%}")
-    print(f"  Total return (excess + RF): {excess_returns.mean() * 12 + rf_aligned['rate'].mean():.1%}")
+    print(f"  Mean monthly excess: {np.nanmean(excess_returns):.4f}")
+    print(f"  Annualized excess: {np.nanmean(excess_returns) * 12:.1%}")
+    print(f"  Total return (excess + RF): {np.nanmean(excess_returns) * 12 + rf_aligned['rate'].mean():.1%}")
     
     # Step 5: Check data subset used by portfolio system
     print(f"\n5. PORTFOLIO SYSTEM DATA SUBSET")
@@ -143,17 +153,22 @@ def analyze_data_pipeline():
     subset_end = '2025-07-31'
     
     try:
-        subset_ils = ils_monthly_returns.loc[subset_start:subset_end]
-        subset_rf = rf_aligned.loc[subset_start:subset_end]
-        subset_monthly_rf = (1 + subset_rf['rate'])**(1/12) - 1
-        subset_excess = subset_ils - subset_monthly_rf
+        # rf_aligned shares the returns' index, so one pair of positions
+        # slices both
+        dates = ils_monthly_returns.index
+        start_idx = dates.searchsorted(pd.Timestamp(subset_start), side='left')
+        end_idx = dates.searchsorted(pd.Timestamp(subset_end), side='right')
+        subset_ils = ils_monthly_returns.iloc[start_idx:end_idx]
+        subset_rf = rf_aligned.iloc[start_idx:end_idx]
+        subset_monthly_rf = compound_rate(subset_rf['rate'].to_numpy(), 1/12)
+        subset_excess = subset_ils.to_numpy() - subset_monthly_rf
         
         print(f"Subset period: {subset_start} to {subset_end}")
         print(f"Subset observations: {len(subset_ils)}")
         print(f"Subset mean monthly return: {subset_ils.mean():.4f}")
-        print(f"Subset annualized return: {(1 + subset_ils.mean())**12 - 1:.1%}")
-        print(f"Subset excess return: {subset_excess.mean() * 12:.1%}")
-        print(f"Subset total return: {subset_excess.mean() * 12 + subset_rf['rate'].mean():.1%}")
+        print(f"Subset annualized return: {compound_rate(subset_ils.mean(), 12):.1%}")
+        print(f"Subset excess return: {np.nanmean(subset_excess) * 12:.1%}")
+        print(f"Subset total return: {np.nanmean(subset_excess) * 12 + subset_rf['rate'].mean():.1%}")
         
         # This should match what our portfolio system shows!
         
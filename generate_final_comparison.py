@@ -14,6 +14,83 @@ from portfolio.sortino_optimizer import SortinoOptimizer
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+def _asset_stats_numpy(returns):
+    """Per-column (mean, std, downside std, downside count, max drawdown)
+    
+    returns is an (n_months, n_assets) matrix; each statistic comes back as
+    an n_assets array from a single axis-0 reduction over the whole matrix.
+    """
+    is_down = returns < 0
+    n_down = is_down.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        downside_std = np.nanstd(np.where(is_down, returns, np.nan), axis=0, ddof=1)
+    downside_std[n_down < 2] = np.nan
+    
+    cumulative = np.cumprod(1.0 + returns, axis=0)
+    running_max = np.maximum.accumulate(cumulative, axis=0)
+    max_dd = (1.0 - cumulative / running_max).max(axis=0)
+    
+    return returns.mean(axis=0), returns.std(axis=0, ddof=1), downside_std, n_down, max_dd
+
+def _asset_stats_loop(returns):
+    """Same as _asset_stats_numpy, as explicit loops for Numba to compile"""
+    n, m = returns.shape
+    means = np.empty(m)
+    stds = np.empty(m)
+    downside_stds = np.empty(m)
+    n_downs = np.zeros(m, dtype=np.int64)
+    max_dds = np.zeros(m)
+    
+    for j in range(m):
+        total = 0.0
+        down_total = 0.0
+        n_down = 0
+        for i in range(n):
+            total += returns[i, j]
+            if returns[i, j] < 0:
+                down_total += returns[i, j]
+                n_down += 1
+        mean = total / n
+        down_mean = down_total / n_down if n_down > 0 else 0.0
+        
+        # Second pass: variances plus drawdown from running product and peak
+        sq = 0.0
+        down_sq = 0.0
+        cumulative = 1.0
+        running_max = 1.0
+        max_dd = 0.0
+        for i in range(n):
+            r = returns[i, j]
+            sq += (r - mean) ** 2
+            if r < 0:
+                down_sq += (r - down_mean) ** 2
+            cumulative *= 1.0 + r
+            if i == 0 or cumulative > running_max:
+                running_max = cumulative
+            drawdown = 1.0 - cumulative / running_max
+            if drawdown > max_dd:
+                max_dd = drawdown
+        
+        means[j] = mean
+        stds[j] = np.sqrt(sq / (n - 1)) if n > 1 else np.nan
+        downside_stds[j] = np.sqrt(down_sq / (n_down - 1)) if n_down > 1 else np.nan
+        n_downs[j] = n_down
+        max_dds[j] = max_dd
+    
+    return means, stds, downside_stds, n_downs, max_dds
+
+if NUMBA_AVAILABLE:
+    # No fastmath: return columns can hold NaN, which it assumes away
+    _asset_stats = njit(cache=True)(_asset_stats_loop)
+else:
+    _asset_stats = _asset_stats_numpy
+
 def generate_final_comparison():
     """Generate comprehensive comparison of all strategies"""
     
@@ -26,8 +103,6 @@ def generate_final_comparison():
     data_manager = ILSDataManager()
     optimizer = SortinoOptimizer(data_manager)
     
-    results = []
-    
     # 1. Single Asset Strategies
     print("\nCalculating single-asset strategies...")
     single_assets = [
@@ -40,49 +115,7 @@ def generate_final_comparison():
         'US_REIT_Select'
     ]
     
-    for asset_name in single_assets:
-        if asset_name in data_manager.returns_data.columns:
-            returns = data_manager.returns_data[asset_name]
-            annual_return = returns.mean() * 12
-            annual_vol = returns.std() * np.sqrt(12)
-            rf = data_manager.risk_free_rate.mean()
-            sharpe = (annual_return - rf) / annual_vol
-            
-            # Calculate Sortino
-            downside_returns = returns[returns < 0]
-            if len(downside_returns) > 0:
-                downside_dev = downside_returns.std() * np.sqrt(12)
-            else:
-                downside_dev = 0.001
-            sortino = (annual_return - rf) / downside_dev
-            
-            # Max drawdown
-            cumulative = (1 + returns).cumprod()
-            running_max = cumulative.expanding().max()
-            drawdown = (cumulative - running_max) / running_max
-            max_dd = abs(drawdown.min())
-            
-            row = {
-                'Strategy_Type': 'Single Asset',
-                'Strategy_Name': asset_name.replace('_', ' '),
-                'Aggressiveness': 'N/A',
-                'Expected_Return_%': annual_return * 100,
-                'Volatility_%': annual_vol * 100,
-                'Sharpe_Ratio': sharpe,
-                'Sortino_Ratio': sortino,
-                'Max_Drawdown_%': max_dd * 100,
-                f'{asset_name}_%': 100.0
-            }
-            
-            # Add zeros for other assets
-            for other_asset in single_assets:
-                if other_asset != asset_name:
-                    row[f'{other_asset}_%'] = 0.0
-                    
-            results.append(row)
-    
-    # 2. New Sortino Optimizer Results
-    print("\nOptimizing with new Sortino optimizer...")
+    # 2. New Sortino Optimizer profiles
     optimization_profiles = [
         (0.0, "Ultra Conservative (New)"),
         (0.25, "Conservative (New)"),
@@ -92,36 +125,79 @@ def generate_final_comparison():
         (1.0, "Ultra Aggressive (New)")
     ]
     
-    for aggressiveness, label in optimization_profiles:
+    available_assets = [a for a in single_assets if a in data_manager.returns_data.columns]
+    optimizer_assets = data_manager.returns_data.columns.tolist()
+    
+    # Output rows are written into preallocated arrays: one metric block and
+    # one weight block with a column per asset. Weight cells an asset's row
+    # never sets stay NaN and are written as blanks.
+    asset_names = single_assets + [a for a in optimizer_assets if a not in single_assets]
+    asset_index = {asset: j for j, asset in enumerate(asset_names)}
+    optimizer_cols = np.array([asset_index[a] for a in optimizer_assets], dtype=np.intp)
+    
+    n_rows = len(available_assets) + len(optimization_profiles)
+    strategy_types = []
+    strategy_names = []
+    aggressiveness_values = []
+    metrics = np.empty((n_rows, 5), dtype=np.float64)
+    weights = np.full((n_rows, len(asset_names)), np.nan, dtype=np.float64)
+    
+    # All single-asset statistics in one pass over the (months x assets) matrix
+    returns = data_manager.returns_data[available_assets].to_numpy(dtype=np.float64)
+    means, stds, downside_stds, n_downs, max_dds = _asset_stats(returns)
+    rf = data_manager.risk_free_rate.mean()
+    
+    for j, asset_name in enumerate(available_assets):
+        annual_return = means[j] * 12
+        annual_vol = stds[j] * np.sqrt(12)
+        max_dd = max_dds[j]
+        sharpe = (annual_return - rf) / annual_vol
+        
+        # Calculate Sortino
+        if n_downs[j] > 0:
+            downside_dev = downside_stds[j] * np.sqrt(12)
+        else:
+            downside_dev = 0.001
+        sortino = (annual_return - rf) / downside_dev
+        
+        strategy_types.append('Single Asset')
+        strategy_names.append(asset_name.replace('_', ' '))
+        aggressiveness_values.append('N/A')
+        metrics[j] = (annual_return * 100, annual_vol * 100, sharpe, sortino, max_dd * 100)
+        
+        # 100% in this asset, zeros for the other single assets
+        weights[j, :len(single_assets)] = 0.0
+        weights[j, asset_index[asset_name]] = 100.0
+
+    print("\nOptimizing with new Sortino optimizer...")
+    # Shared optimizer inputs are built once for all profiles
+    optimizer.prepare()
+    
+    for i, (aggressiveness, label) in enumerate(optimization_profiles, start=len(available_assets)):
         print(f"  Optimizing {label}...")
         result = optimizer.optimize(aggressiveness)
         
-        row = {
-            'Strategy_Type': 'Sortino Optimized',
-            'Strategy_Name': label,
-            'Aggressiveness': aggressiveness,
-            'Expected_Return_%': result['expected_return'] * 100,
-            'Volatility_%': result['volatility'] * 100,
-            'Sharpe_Ratio': result['sharpe_ratio'],
-            'Sortino_Ratio': result['sortino_ratio'],
-            'Max_Drawdown_%': result['max_drawdown'] * 100
-        }
+        strategy_types.append('Sortino Optimized')
+        strategy_names.append(label)
+        aggressiveness_values.append(aggressiveness)
+        metrics[i] = (result['expected_return'] * 100, result['volatility'] * 100,
+                      result['sharpe_ratio'], result['sortino_ratio'], result['max_drawdown'] * 100)
         
         # Add individual asset weights
-        for asset in data_manager.returns_data.columns:
-            row[f'{asset}_%'] = result['weights'].get(asset, 0.0) * 100
-            
-        results.append(row)
+        weights[i, optimizer_cols] = [result['weights'].get(asset, 0.0) for asset in optimizer_assets]
+        weights[i, optimizer_cols] *= 100
     
     # Create DataFrame
-    df = pd.DataFrame(results)
-    
-    # Reorder columns
-    base_cols = ['Strategy_Type', 'Strategy_Name', 'Aggressiveness', 
-                 'Expected_Return_%', 'Volatility_%', 'Sharpe_Ratio', 
-                 'Sortino_Ratio', 'Max_Drawdown_%']
-    asset_cols = [col for col in df.columns if col.endswith('_%') and col not in base_cols]
-    df = df[base_cols + asset_cols]
+    metric_cols = ['Expected_Return_%', 'Volatility_%', 'Sharpe_Ratio', 
+                   'Sortino_Ratio', 'Max_Drawdown_%']
+    # Strategy_Type repeats two labels across all rows, so store it categorical
+    df = pd.DataFrame({
+        'Strategy_Type': pd.Categorical(strategy_types),
+        'Strategy_Name': strategy_names,
+        'Aggressiveness': aggressiveness_values,
+        **{col: metrics[:, k] for k, col in enumerate(metric_cols)},
+        **{f'{asset}_%': weights[:, j] for j, asset in enumerate(asset_names)}
+    })
     
     # Sort by expected return
     df = df.sort_values('Expected_Return_%', ascending=False)
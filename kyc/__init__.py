@@ -5,15 +5,24 @@ This module handles customer risk profiling through scenario-based questions,
 consistency validation, and mapping to portfolio optimization constraints.
 """
 
-from .models import KYCResponse, RiskProfile, KYCInconsistency
-from .risk_assessor import KYCRiskAssessor
+from .models import KYCResponse, RiskProfile, RiskProfileBatch, KYCInconsistency
 from .constants import RISK_CATEGORIES, KYC_QUESTIONS
 
 __all__ = [
     'KYCResponse',
     'RiskProfile', 
+    'RiskProfileBatch',
     'KYCInconsistency',
     'KYCRiskAssessor',
     'RISK_CATEGORIES',
     'KYC_QUESTIONS'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    # KYCRiskAssessor is imported on first access, so callers that only
+    # need the models and constants skip loading the assessment engine
+    if name == 'KYCRiskAssessor':
+        from .risk_assessor import KYCRiskAssessor
+        return KYCRiskAssessor
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,66 @@
+"""
+Compiled scoring kernel for batch KYC assessment.
+
+Computes composite scores, risk categories and risk levels for many
+consistent responses in one native loop. Numba is optional; without it the
+same loop runs as plain Python.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _batch_assess_loop(scores, weights, score_lo, score_hi, fallback_category, fallback_level,
+                       level_upper, level_start, level_width, level_base, level_span):
+    """
+    Score each row of an (N, 5) component matrix.
+
+    Mirrors KYCRiskAssessor's single-response path: a left-to-right weighted
+    sum, the 0-100 clamp, the first category whose inclusive score range
+    holds the score (fallback_category at fallback_level otherwise) and the
+    piecewise 1-10 risk level. The ranges and level segments are the
+    columns of kyc.constants' tables, passed in so they have one source.
+
+    Returns:
+        Tuple of (unclamped composite scores, category indices, risk levels)
+    """
+    n, m = scores.shape
+    composite = np.empty(n)
+    category = np.empty(n, dtype=np.int64)
+    level = np.empty(n, dtype=np.int64)
+
+    for i in range(n):
+        total = 0.0
+        for j in range(m):
+            total += scores[i, j] * weights[j]
+        composite[i] = total
+        score = max(0.0, min(100.0, total))
+
+        category[i] = fallback_category
+        level[i] = fallback_level
+        for k in range(score_lo.size):
+            if score_lo[k] <= score <= score_hi[k]:
+                category[i] = k
+                # First segment whose upper bound reaches the score
+                s = 0
+                while s < level_upper.size - 1 and score > level_upper[s]:
+                    s += 1
+                base = level_base[s]
+                span = level_span[s]
+                level[i] = max(base, min(base + span, int(base + ((score - level_start[s]) / level_width[s]) * span)))
+                break
+
+    return composite, category, level
+
+
+if NUMBA_AVAILABLE:
+    # No fastmath: reassociating the weighted sum could move a boundary
+    # score by one ulp and change its category
+    batch_assess = njit(cache=True)(_batch_assess_loop)
+else:
+    batch_assess = _batch_assess_loop
@@ -5,7 +5,9 @@ Contains risk categories, question definitions, scoring weights,
 and validation rules used throughout the assessment process.
 """
 
+import bisect
 from typing import Dict, List, Tuple
+import numpy as np
 from .models import InconsistencyType
 
 
@@ -98,6 +100,131 @@ RISK_CATEGORIES = {
 }
 
 
+# Structure-of-arrays view of RISK_CATEGORIES, one entry per category in
+# ascending score order. RISK_CATEGORIES stays the source of truth; these
+# arrays let numeric code read category constraints by integer index.
+CATEGORY_KEYS = tuple(RISK_CATEGORIES)
+
+_SCORE_LO = np.array([c['score_range'][0] for c in RISK_CATEGORIES.values()], dtype=np.int32)
+_SCORE_HI = np.array([c['score_range'][1] for c in RISK_CATEGORIES.values()], dtype=np.int32)
+_MAX_DD = np.array([c['max_drawdown'] for c in RISK_CATEGORIES.values()], dtype=np.float64)
+_TGT_VOL = np.array([c['target_volatility'] for c in RISK_CATEGORIES.values()], dtype=np.float64)
+_RECOVERY_MONTHS = np.array([c['recovery_time_months'] for c in RISK_CATEGORIES.values()], dtype=np.int32)
+_EQ_MIN = np.array([c['equity_range'][0] for c in RISK_CATEGORIES.values()], dtype=np.float64)
+_EQ_MAX = np.array([c['equity_range'][1] for c in RISK_CATEGORIES.values()], dtype=np.float64)
+_INTL_MAX = np.array([c['international_max'] for c in RISK_CATEGORIES.values()], dtype=np.float64)
+_ALT_MAX = np.array([c['alternatives_max'] for c in RISK_CATEGORIES.values()], dtype=np.float64)
+
+for _arr in (_SCORE_LO, _SCORE_HI, _MAX_DD, _TGT_VOL, _RECOVERY_MONTHS,
+             _EQ_MIN, _EQ_MAX, _INTL_MAX, _ALT_MAX):
+    _arr.flags.writeable = False
+del _arr
+
+
+_CATEGORY_KEY_ARRAY = np.array(CATEGORY_KEYS, dtype=object)
+
+# Score ranges are inclusive integer ranges with gaps between them (25-26,
+# 45-46, ...). A fractional score in a gap, e.g. 25.5, belongs to no
+# category and falls back to the moderate one at a fixed risk level.
+FALLBACK_CATEGORY = 'מתון'
+FALLBACK_RISK_LEVEL = 5
+_FALLBACK_INDEX = CATEGORY_KEYS.index(FALLBACK_CATEGORY)
+
+# Plain-float copies of the bounds, for bisecting single scores without
+# a NumPy call
+_SCORE_LO_LIST = _SCORE_LO.tolist()
+_SCORE_HI_LIST = _SCORE_HI.tolist()
+
+
+def classify_score(score):
+    """
+    Return the CATEGORY_KEYS index of the category containing score.
+    
+    Accepts a scalar or an array of scores. Scores are clamped to 0-100,
+    then land in the category whose inclusive score range holds them;
+    scores in the gaps between ranges get FALLBACK_CATEGORY's index. Use
+    the index to read the constraint arrays above, e.g.
+    _MAX_DD[classify_score(score)].
+    """
+    if np.ndim(score) == 0:
+        score = max(0, min(100, score))
+        # The first category whose upper bound reaches the score, unless
+        # the score is in the gap below its lower bound
+        index = bisect.bisect_left(_SCORE_HI_LIST, score)
+        return index if _SCORE_LO_LIST[index] <= score else _FALLBACK_INDEX
+    score = np.clip(score, 0, 100)
+    index = np.searchsorted(_SCORE_HI, score, side='left')
+    return np.where(_SCORE_LO[index] <= score, index, _FALLBACK_INDEX)
+
+
+def score_to_category(score):
+    """
+    Map a composite score to its RISK_CATEGORIES key.
+    
+    A scalar score returns a single key; an array of scores is classified
+    in one searchsorted pass and returns an array of keys. Scores in the
+    gaps between ranges map to FALLBACK_CATEGORY.
+    """
+    index = classify_score(score)
+    if np.ndim(index) == 0:
+        return CATEGORY_KEYS[index]
+    return _CATEGORY_KEY_ARRAY[index]
+
+
+# Piecewise-linear score -> 1-10 risk level, one segment per row as
+# (upper score, start score, width, first level, level span); a score on a
+# segment's upper bound belongs to that segment. This is the only copy of
+# the table: the assessor, RiskProfile.from_batch and the kyc._fast batch
+# kernel all read the columns derived below.
+RISK_LEVEL_SEGMENTS = (
+    (25, 0, 25, 1, 2),
+    (45, 25, 20, 3, 2),
+    (65, 45, 20, 5, 2),
+    (85, 65, 20, 7, 2),
+    (100, 85, 15, 9, 1),
+)
+
+_LEVEL_UPPER_LIST, _LEVEL_START_LIST, _LEVEL_WIDTH_LIST, _LEVEL_BASE_LIST, _LEVEL_SPAN_LIST = (
+    list(column) for column in zip(*RISK_LEVEL_SEGMENTS)
+)
+_LEVEL_UPPER = np.array(_LEVEL_UPPER_LIST, dtype=np.float64)
+_LEVEL_START = np.array(_LEVEL_START_LIST, dtype=np.float64)
+_LEVEL_WIDTH = np.array(_LEVEL_WIDTH_LIST, dtype=np.float64)
+_LEVEL_BASE = np.array(_LEVEL_BASE_LIST, dtype=np.int64)
+_LEVEL_SPAN = np.array(_LEVEL_SPAN_LIST, dtype=np.int64)
+
+for _arr in (_LEVEL_UPPER, _LEVEL_START, _LEVEL_WIDTH, _LEVEL_BASE, _LEVEL_SPAN):
+    _arr.flags.writeable = False
+del _arr
+
+
+def score_to_risk_level(score):
+    """
+    Map composite scores to the 1-10 risk level used by the optimizer.
+    
+    Accepts a scalar or an array of scores, clamped to 0-100 like
+    classify_score. Each score interpolates linearly within its segment and
+    is clamped to the segment's level range; scores in the gaps between
+    category ranges get FALLBACK_RISK_LEVEL.
+    """
+    if np.ndim(score) == 0:
+        score = max(0, min(100, score))
+        index = bisect.bisect_left(_SCORE_HI_LIST, score)
+        if score < _SCORE_LO_LIST[index]:
+            return FALLBACK_RISK_LEVEL
+        segment = bisect.bisect_left(_LEVEL_UPPER_LIST, score)
+        base, span = _LEVEL_BASE_LIST[segment], _LEVEL_SPAN_LIST[segment]
+        return max(base, min(base + span, int(
+            base + ((score - _LEVEL_START_LIST[segment]) / _LEVEL_WIDTH_LIST[segment]) * span)))
+    score = np.clip(np.asarray(score, dtype=np.float64), 0, 100)
+    segment = np.searchsorted(_LEVEL_UPPER, score, side='left')
+    base = _LEVEL_BASE[segment]
+    level = np.trunc(base + (score - _LEVEL_START[segment]) / _LEVEL_WIDTH[segment] * _LEVEL_SPAN[segment])
+    level = np.clip(level.astype(np.int64), base, base + _LEVEL_SPAN[segment])
+    in_gap = score < _SCORE_LO[np.searchsorted(_SCORE_HI, score, side='left')]
+    return np.where(in_gap, FALLBACK_RISK_LEVEL, level)
+
+
 # KYC Questions with scoring (refined scenarios)
 KYC_QUESTIONS = {
     'horizon': {
@@ -169,6 +296,37 @@ KYC_QUESTIONS = {
 }
 
 
+# Option scores of KYC_QUESTIONS as a (question, option) lookup table, so
+# scoring an answer doesn't walk the option dicts. Questions with fewer
+# options are padded with -1.
+QUESTION_KEYS = tuple(KYC_QUESTIONS)
+_QUESTION_INDEX = {question: i for i, question in enumerate(QUESTION_KEYS)}
+
+_SCORES = np.full(
+    (len(KYC_QUESTIONS), max(len(q['options']) for q in KYC_QUESTIONS.values())),
+    -1, dtype=np.int8
+)
+for _i, _question in enumerate(KYC_QUESTIONS.values()):
+    _SCORES[_i, :len(_question['options'])] = [option['score'] for option in _question['options']]
+_SCORES.flags.writeable = False
+del _i, _question
+
+
+def score_answer(question: str, option_idx: int) -> int:
+    """
+    Return the score of answer option_idx to a KYC question.
+    
+    Raises:
+        ValueError: If the question is unknown or has no such option
+    """
+    if question not in _QUESTION_INDEX:
+        raise ValueError(f"Unknown KYC question: {question}")
+    row = _SCORES[_QUESTION_INDEX[question]]
+    if not 0 <= option_idx < row.size or row[option_idx] < 0:
+        raise ValueError(f"Invalid option {option_idx} for KYC question: {question}")
+    return int(row[option_idx])
+
+
 # Scoring weights for composite calculation
 SCORING_WEIGHTS = {
     'horizon': 0.25,        # 25% - Time horizon is crucial
@@ -213,4 +371,27 @@ CONSISTENCY_RULES = {
         'suggested_action': 'use_conservative_score',
         'severity': 'warning'
     }
-}
\ No newline at end of file
+}
+
+
+def evaluate_consistency_rules(scores: np.ndarray) -> np.ndarray:
+    """
+    Evaluate every CONSISTENCY_RULES condition over a batch of responses.
+    
+    Args:
+        scores: (N, 6) array of response scores in KYC_SCORE_FIELDS order
+        
+    Returns:
+        (N, 4) bool matrix, column j set when the j-th rule of
+        CONSISTENCY_RULES triggers for that response
+    """
+    scores = np.asarray(scores)
+    horizon, loss, experience, financial, goal, sleep = scores.T
+    # Same conditions, in the same order, as the CONSISTENCY_RULES lambdas;
+    # widen before subtracting so small unsigned dtypes cannot wrap
+    return np.stack([
+        (horizon < 30) & (loss > 70),
+        (experience < 30) & (goal > 80),
+        (financial < 40) & (loss > 60),
+        np.abs(sleep.astype(np.int64) - loss) > 40,
+    ], axis=1)
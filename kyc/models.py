@@ -8,6 +8,7 @@ and validation results used throughout the assessment process.
 from dataclasses import dataclass
 from typing import List, Optional, Dict
 from enum import Enum
+import numpy as np
 
 
 class InconsistencyType(Enum):
@@ -18,6 +19,11 @@ class InconsistencyType(Enum):
     SLEEP_LOSS_MISMATCH = "sleep_loss_mismatch"
 
 
+# KYCResponse score fields, in declaration order
+KYC_SCORE_FIELDS = ('horizon_score', 'loss_tolerance', 'experience_score',
+                    'financial_score', 'goal_score', 'sleep_score')
+
+
 @dataclass
 class KYCResponse:
     """
@@ -33,12 +39,40 @@ class KYCResponse:
     
     def __post_init__(self):
         """Validate that all scores are in valid range"""
-        for field_name, value in self.__dict__.items():
-            if not isinstance(value, int) or not 0 <= value <= 100:
-                raise ValueError(f"{field_name} must be an integer between 0 and 100, got {value}")
+        values = (self.horizon_score, self.loss_tolerance, self.experience_score,
+                  self.financial_score, self.goal_score, self.sleep_score)
+        if (not all(isinstance(value, int) for value in values)
+                or min(values) < 0 or max(values) > 100):
+            # Slow path: find the offending field for the error message
+            for field_name, value in zip(KYC_SCORE_FIELDS, values):
+                if not isinstance(value, int) or not 0 <= value <= 100:
+                    raise ValueError(f"{field_name} must be an integer between 0 and 100, got {value}")
+    
+    @classmethod
+    def from_arrays(cls, scores: np.ndarray) -> List['KYCResponse']:
+        """
+        Build responses from an (N, 6) integer array in KYC_SCORE_FIELDS order.
+        
+        The whole batch is validated with one vectorized bounds check, so
+        the per-response validation in __post_init__ is skipped.
+        """
+        scores = np.asarray(scores)
+        if scores.ndim != 2 or scores.shape[1] != len(KYC_SCORE_FIELDS):
+            raise ValueError(f"scores must have shape (N, {len(KYC_SCORE_FIELDS)}), got {scores.shape}")
+        if not np.issubdtype(scores.dtype, np.integer):
+            raise ValueError(f"scores must be integers, got dtype {scores.dtype}")
+        if ((scores < 0) | (scores > 100)).any():
+            raise ValueError("All scores must be integers between 0 and 100")
+        
+        responses = []
+        for row in scores.tolist():
+            response = object.__new__(cls)
+            response.__dict__.update(zip(KYC_SCORE_FIELDS, row))
+            responses.append(response)
+        return responses
 
 
-@dataclass 
+@dataclass(slots=True)
 class KYCInconsistency:
     """Represents an inconsistency found in KYC responses"""
     type: InconsistencyType
@@ -48,7 +82,7 @@ class KYCInconsistency:
     severity: str = "warning"  # "warning" or "error"
 
 
-@dataclass
+@dataclass(slots=True)
 class RiskProfile:
     """
     Processed risk profile result from KYC assessment.
@@ -83,4 +117,69 @@ class RiskProfile:
     
     def has_warnings(self) -> bool:
         """Check if profile has any warnings"""
-        return len(self.inconsistencies) > 0
\ No newline at end of file
+        return len(self.inconsistencies) > 0
+    
+    @classmethod
+    def from_batch(cls, scores: np.ndarray) -> 'RiskProfileBatch':
+        """
+        Classify an array of composite scores in one pass.
+        
+        Unlike KYCRiskAssessor, this works from final composite scores: no
+        consistency checks or adjustments are applied. Categories and levels
+        come from the same constants helpers the assessor uses, so scores
+        between category ranges fall back the same way.
+        """
+        # Imported here since constants depends on this module
+        from .constants import (
+            classify_score, score_to_risk_level, _MAX_DD, _TGT_VOL,
+            _RECOVERY_MONTHS, _EQ_MIN, _EQ_MAX, _INTL_MAX, _ALT_MAX
+        )
+        
+        scores = np.clip(np.asarray(scores, dtype=np.float64), 0, 100)
+        category_index = classify_score(scores)
+        
+        return RiskProfileBatch(
+            composite_score=scores,
+            category_index=category_index,
+            risk_level=score_to_risk_level(scores),
+            max_drawdown=_MAX_DD[category_index],
+            target_volatility=_TGT_VOL[category_index],
+            recovery_time_months=_RECOVERY_MONTHS[category_index],
+            equity_min=_EQ_MIN[category_index],
+            equity_max=_EQ_MAX[category_index],
+            international_max=_INTL_MAX[category_index],
+            alternatives_max=_ALT_MAX[category_index]
+        )
+
+
+@dataclass
+class RiskProfileBatch:
+    """
+    Risk classification of many composite scores, one array per field.
+    
+    Entry i of every array describes the i-th score; category_index
+    indexes kyc.constants.CATEGORY_KEYS.
+    """
+    composite_score: np.ndarray
+    category_index: np.ndarray
+    risk_level: np.ndarray
+    
+    # Risk measures for constraints
+    max_drawdown: np.ndarray
+    target_volatility: np.ndarray
+    recovery_time_months: np.ndarray
+    
+    # Portfolio allocation guidelines
+    equity_min: np.ndarray
+    equity_max: np.ndarray
+    international_max: np.ndarray
+    alternatives_max: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.composite_score)
+    
+    @property
+    def category_hebrew(self) -> np.ndarray:
+        """Hebrew risk category name of each score"""
+        from .constants import CATEGORY_KEYS
+        return np.array(CATEGORY_KEYS, dtype=object)[self.category_index]
\ No newline at end of file
@@ -6,14 +6,24 @@ risk profiles for portfolio optimization.
 """
 
 import logging
-from typing import Dict, List, Tuple
+from types import MappingProxyType
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
-from .models import KYCResponse, RiskProfile, KYCInconsistency, InconsistencyType
-from .constants import RISK_CATEGORIES, SCORING_WEIGHTS, CONSISTENCY_RULES
+import numpy as np
+
+from .models import KYCResponse, RiskProfile, KYCInconsistency, InconsistencyType, KYC_SCORE_FIELDS
+from .constants import (
+    RISK_CATEGORIES, SCORING_WEIGHTS, CONSISTENCY_RULES, CATEGORY_KEYS, evaluate_consistency_rules,
+    FALLBACK_RISK_LEVEL, classify_score, score_to_risk_level, _FALLBACK_INDEX, _SCORE_LO, _SCORE_HI,
+    _LEVEL_UPPER, _LEVEL_START, _LEVEL_WIDTH, _LEVEL_BASE, _LEVEL_SPAN
+)
+from ._fast import batch_assess
 
 logger = logging.getLogger(__name__)
 
+_REQUIRED_FIELDS = frozenset(KYC_SCORE_FIELDS)
+
 
 class KYCRiskAssessor:
     """
@@ -29,15 +39,42 @@ class KYCRiskAssessor:
     
     def __init__(self):
         """Initialize the risk assessor with default configuration"""
-        self.scoring_weights = SCORING_WEIGHTS.copy()
-        self.consistency_rules = CONSISTENCY_RULES.copy()
+        # Read-only views: the tables below are derived from these once, so
+        # later edits would silently not apply
+        self.scoring_weights = MappingProxyType(SCORING_WEIGHTS)
+        self.consistency_rules = MappingProxyType(CONSISTENCY_RULES)
+        
+        # Scored components and their weights, in the order they are read
+        # off KYCResponse, so a composite score is one multiply-and-sum pass
+        self._components = ('horizon', 'loss_tolerance', 'experience', 'financial', 'goal')
+        self._weight_vec = tuple(self.scoring_weights[c] for c in self._components)
+        
+        # Category score bounds as the batch kernel reads them
+        self._cat_lo = _SCORE_LO.astype(np.float64)
+        self._cat_hi = _SCORE_HI.astype(np.float64)
         
-    def process_responses(self, responses_dict: Dict[str, int]) -> RiskProfile:
+        # Risk level of every integer score 0-100; most composite scores of
+        # integer answers land on a whole number, which then skips the
+        # piecewise formula
+        self._level_lut = tuple(score_to_risk_level(score) for score in range(101))
+        
+        # Consistency rules flattened to tuples so the per-response check
+        # does no dict lookups
+        self._compiled_rules = tuple(
+            (inconsistency_type, rule['condition'], rule['message_he'], rule['message_en'],
+             rule['suggested_action'], rule['severity'])
+            for inconsistency_type, rule in self.consistency_rules.items()
+        )
+        
+    def process_responses(self, responses_dict: Dict[str, int],
+                          assessment_timestamp: Optional[str] = None) -> RiskProfile:
         """
         Main entry point: Process KYC responses and return complete risk profile.
         
         Args:
             responses_dict: Dictionary with question responses (scores 0-100)
+            assessment_timestamp: ISO timestamp to stamp the profile with; defaults
+                to now. Callers assessing many responses can pass one shared value.
             
         Returns:
             RiskProfile: Complete risk assessment with constraints and metadata
@@ -50,6 +87,11 @@ class KYCRiskAssessor:
         # Validate and create response object
         kyc_response = self._validate_and_create_response(responses_dict)
         
+        return self._assess(kyc_response, assessment_timestamp)
+    
+    def _assess(self, kyc_response: KYCResponse,
+                assessment_timestamp: Optional[str] = None) -> RiskProfile:
+        """Assess one validated response; the body of process_responses"""
         # Check for inconsistencies
         inconsistencies = self._validate_consistency(kyc_response)
         
@@ -70,20 +112,77 @@ class KYCRiskAssessor:
             category=risk_category, 
             composite_score=adjusted_score,
             inconsistencies=inconsistencies,
-            original_response=kyc_response
+            original_response=kyc_response,
+            assessment_timestamp=assessment_timestamp
         )
         
         logger.info(f"KYC assessment complete: risk_level={risk_level}, category={risk_category}")
         return risk_profile
     
+    def process_batch(self, responses: List[Dict[str, int]],
+                      assessment_timestamp: Optional[str] = None) -> List[RiskProfile]:
+        """
+        Process many KYC responses, returning one RiskProfile per response.
+        
+        Responses that trigger no consistency rule, the common case, are
+        scored together by the compiled kyc._fast kernel; flagged ones go
+        through the regular single-response path. Results match calling
+        process_responses on each response, and all profiles share one
+        assessment timestamp.
+        
+        Raises:
+            ValueError: If any response is invalid or missing required fields
+        """
+        if not responses:
+            return []
+        assessment_timestamp = assessment_timestamp or datetime.now().isoformat()
+        
+        # Validate with the same rules as KYCResponse: exactly the score
+        # fields, each an int in 0-100. Offending responses go through the
+        # single-response validation so the error message is identical.
+        for response in responses:
+            if response.keys() != _REQUIRED_FIELDS or not all(
+                    isinstance(value, int) and 0 <= value <= 100 for value in response.values()):
+                self._validate_and_create_response(response)
+        
+        # Pack all scores into one (N, 6) matrix in KYC_SCORE_FIELDS order
+        scores = np.fromiter(
+            (response[field] for response in responses for field in KYC_SCORE_FIELDS),
+            dtype=np.int64, count=len(responses) * len(KYC_SCORE_FIELDS)
+        ).reshape(len(responses), len(KYC_SCORE_FIELDS))
+        kyc_responses = KYCResponse.from_arrays(scores)
+        flagged = evaluate_consistency_rules(scores).any(axis=1)
+        
+        composite, category, level = batch_assess(
+            scores[:, :len(self._components)].astype(np.float64),
+            np.array(self._weight_vec, dtype=np.float64),
+            self._cat_lo, self._cat_hi, _FALLBACK_INDEX, FALLBACK_RISK_LEVEL,
+            _LEVEL_UPPER, _LEVEL_START, _LEVEL_WIDTH, _LEVEL_BASE, _LEVEL_SPAN
+        )
+        
+        profiles = []
+        for i, kyc_response in enumerate(kyc_responses):
+            if flagged[i]:
+                profiles.append(self._assess(kyc_response, assessment_timestamp))
+            else:
+                profiles.append(self._create_risk_profile(
+                    risk_level=int(level[i]),
+                    category=CATEGORY_KEYS[category[i]],
+                    composite_score=max(0, min(100, float(composite[i]))),
+                    inconsistencies=[],
+                    original_response=kyc_response,
+                    assessment_timestamp=assessment_timestamp
+                ))
+        return profiles
+    
     def _validate_and_create_response(self, responses_dict: Dict[str, int]) -> KYCResponse:
         """Validate input and create KYCResponse object"""
-        required_fields = ['horizon_score', 'loss_tolerance', 'experience_score', 
-                          'financial_score', 'goal_score', 'sleep_score']
-        
-        for field in required_fields:
-            if field not in responses_dict:
-                raise ValueError(f"Missing required field: {field}")
+        missing = _REQUIRED_FIELDS.difference(responses_dict)
+        if missing:
+            missing_fields = [field for field in KYC_SCORE_FIELDS if field in missing]
+            if len(missing_fields) == 1:
+                raise ValueError(f"Missing required field: {missing_fields[0]}")
+            raise ValueError(f"Missing required fields: {', '.join(missing_fields)}")
         
         try:
             return KYCResponse(**responses_dict)
@@ -102,18 +201,18 @@ class KYCRiskAssessor:
         """
         inconsistencies = []
         
-        for inconsistency_type, rule in self.consistency_rules.items():
-            if rule['condition'](response):
+        for inconsistency_type, condition, message_he, message_en, action, severity in self._compiled_rules:
+            if condition(response):
                 inconsistency = KYCInconsistency(
                     type=inconsistency_type,
-                    message_hebrew=rule['message_he'],
-                    message_english=rule['message_en'],
-                    suggested_action=rule['suggested_action'],
-                    severity=rule['severity']
+                    message_hebrew=message_he,
+                    message_english=message_en,
+                    suggested_action=action,
+                    severity=severity
                 )
                 inconsistencies.append(inconsistency)
                 
-                logger.warning(f"Inconsistency detected: {inconsistency_type.value}")
+                logger.warning("Inconsistency detected: %s", inconsistency_type.value)
         
         return inconsistencies
     
@@ -128,23 +227,30 @@ class KYCRiskAssessor:
             Composite score (0-100)
         """
         # Extract scores (excluding sleep_test which is used for validation only)
-        scores = {
-            'horizon': response.horizon_score,
-            'loss_tolerance': response.loss_tolerance,
-            'experience': response.experience_score, 
-            'financial': response.financial_score,
-            'goal': response.goal_score
-        }
-        
-        # Calculate weighted average
-        composite_score = sum(
-            scores[component] * self.scoring_weights[component]
-            for component in scores.keys()
+        composite_score = self._weighted_score(
+            response.horizon_score, response.loss_tolerance, response.experience_score,
+            response.financial_score, response.goal_score
         )
         
         logger.debug(f"Composite score calculated: {composite_score}")
         return composite_score
     
+    def _weighted_score(self, horizon: float, loss_tolerance: float, experience: float,
+                        financial: float, goal: float) -> float:
+        """
+        Weighted average of the five scored components.
+        
+        Accumulated left to right in plain float additions, exactly as the
+        kyc._fast batch kernel does: category bounds and risk levels switch
+        at exact integer scores, so a reordered (e.g. BLAS) sum, or the
+        compensated summation sum() uses on floats since Python 3.12, could
+        move a boundary score by one ulp and change its classification.
+        """
+        total = 0.0
+        for score, weight in zip((horizon, loss_tolerance, experience, financial, goal), self._weight_vec):
+            total += score * weight
+        return total
+    
     def _apply_consistency_adjustments(self, 
                                     composite_score: float,
                                     response: KYCResponse,
@@ -160,6 +266,10 @@ class KYCRiskAssessor:
         Returns:
             Adjusted composite score
         """
+        # Most responses are consistent; only the bounds clamp applies then
+        if not inconsistencies:
+            return max(0, min(100, composite_score))
+        
         adjusted_score = composite_score
         
         for inconsistency in inconsistencies:
@@ -181,15 +291,10 @@ class KYCRiskAssessor:
                 # Use the more conservative of sleep test vs loss tolerance
                 conservative_score = min(response.sleep_score, response.loss_tolerance)
                 # Recalculate composite with conservative loss tolerance
-                adjusted_loss = conservative_score
-                adjusted_composite = (
-                    response.horizon_score * self.scoring_weights['horizon'] +
-                    adjusted_loss * self.scoring_weights['loss_tolerance'] +
-                    response.experience_score * self.scoring_weights['experience'] +
-                    response.financial_score * self.scoring_weights['financial'] +
-                    response.goal_score * self.scoring_weights['goal']
+                adjusted_score = self._weighted_score(
+                    response.horizon_score, conservative_score, response.experience_score,
+                    response.financial_score, response.goal_score
                 )
-                adjusted_score = adjusted_composite
                 logger.info(f"Using conservative score due to sleep/loss mismatch")
         
         return max(0, min(100, adjusted_score))  # Ensure bounds
@@ -198,47 +303,36 @@ class KYCRiskAssessor:
         """
         Map composite score to risk category and level.
         
+        Scores in the gaps between category ranges fall back to
+        constants.FALLBACK_CATEGORY and FALLBACK_RISK_LEVEL.
+        
         Args:
             composite_score: Adjusted composite score (0-100)
             
         Returns:
             Tuple of (category_key, risk_level_1_to_10)
         """
-        # Find matching category
-        for category_key, category_data in RISK_CATEGORIES.items():
-            min_score, max_score = category_data['score_range']
-            if min_score <= composite_score <= max_score:
-                # Map to 1-10 scale for portfolio optimizer
-                risk_level = self._score_to_risk_level(composite_score, min_score, max_score)
-                return category_key, risk_level
-        
-        # Fallback (shouldn't happen with proper bounds)
-        logger.warning(f"Score {composite_score} didn't match any category, defaulting to moderate")
-        return 'מתון', 5
+        return CATEGORY_KEYS[classify_score(composite_score)], self._score_to_risk_level(composite_score)
     
-    def _score_to_risk_level(self, score: float, category_min: float, category_max: float) -> int:
+    def _score_to_risk_level(self, score: float) -> int:
         """
         Convert composite score to 1-10 risk level within category bounds.
         
         This ensures we use the full 1-10 range while respecting category constraints.
+        Whole-number scores are read from a precomputed table.
         """
-        if score <= 25:
-            return max(1, min(3, int(1 + (score / 25) * 2)))
-        elif score <= 45:
-            return max(3, min(5, int(3 + ((score - 25) / 20) * 2)))
-        elif score <= 65:
-            return max(5, min(7, int(5 + ((score - 45) / 20) * 2)))
-        elif score <= 85:
-            return max(7, min(9, int(7 + ((score - 65) / 20) * 2)))
-        else:
-            return max(9, min(10, int(9 + ((score - 85) / 15) * 1)))
+        index = int(score)
+        if index == score and 0 <= index <= 100:
+            return self._level_lut[index]
+        return score_to_risk_level(score)
     
     def _create_risk_profile(self,
                            risk_level: int,
                            category: str, 
                            composite_score: float,
                            inconsistencies: List[KYCInconsistency],
-                           original_response: KYCResponse) -> RiskProfile:
+                           original_response: KYCResponse,
+                           assessment_timestamp: Optional[str] = None) -> RiskProfile:
         """
         Create complete risk profile with all metadata and constraints.
         
@@ -248,6 +342,7 @@ class KYCRiskAssessor:
             composite_score: Final adjusted composite score
             inconsistencies: Any inconsistencies found
             original_response: Original KYC response
+            assessment_timestamp: ISO timestamp to record, or None for now
             
         Returns:
             Complete RiskProfile object
@@ -255,8 +350,11 @@ class KYCRiskAssessor:
         category_data = RISK_CATEGORIES[category]
         
         # Calculate confidence score based on inconsistencies
-        confidence = 1.0 - (len([i for i in inconsistencies if i.severity == 'warning']) * 0.1)
-        confidence = max(0.5, confidence)  # Minimum 50% confidence
+        if inconsistencies:
+            confidence = 1.0 - (sum(1 for i in inconsistencies if i.severity == 'warning') * 0.1)
+            confidence = max(0.5, confidence)  # Minimum 50% confidence
+        else:
+            confidence = 1.0
         
         return RiskProfile(
             # Core classification
@@ -278,5 +376,10 @@ class KYCRiskAssessor:
             # Metadata
             inconsistencies=inconsistencies,
             confidence_score=confidence,
-            assessment_timestamp=datetime.now().isoformat()
-        )
\ No newline at end of file
+            assessment_timestamp=assessment_timestamp or datetime.now().isoformat()
+        )
+
+
+# Shared assessor for request handlers. It only holds configuration derived
+# in __init__, so one instance can serve every request.
+DEFAULT_ASSESSOR: KYCRiskAssessor = KYCRiskAssessor()
@@ -1,47 +1,392 @@
-from fastapi import FastAPI, Request, Form, Response
+import asyncio
+import atexit
+import functools
+import gzip
+import hashlib
+import itertools
+import logging
+import mimetypes
+import os
+import queue
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from email.utils import formatdate
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, Tuple
+import numpy as np
+from fastapi import FastAPI, Request, Form, Response, HTTPException
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from starlette.datastructures import Headers
+from starlette.staticfiles import NotModifiedResponse
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
 import uvicorn
-from content_loader import content_loader, LANGUAGES
+from content_loader import get_content_loader, LANGUAGES
+from kyc.risk_assessor import DEFAULT_ASSESSOR
+from portfolio.sortino_adapter import SortinoPortfolioOptimizer
 
-app = FastAPI(title="Quantica", description="Intelligent Portfolio Optimization Platform")
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
-# Mount static files (CSS, JS, images)
-app.mount("/static", StaticFiles(directory="static"), name="static")
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
 
-# Templates
-templates = Jinja2Templates(directory="templates")
+# Handlers run on a QueueListener thread, so logging from a request handler
+# only enqueues the record and never blocks the event loop on stream I/O
+_log_queue = queue.SimpleQueue()
+_log_listener = QueueListener(_log_queue, logging.StreamHandler())
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+logger = logging.getLogger(__name__)
+logger.addHandler(QueueHandler(_log_queue))
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+logger.propagate = False
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    prerender_pages()
+    yield
+
+app = FastAPI(title="Quantica", description="Intelligent Portfolio Optimization Platform",
+              lifespan=lifespan)
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse serialized by orjson, which also accepts NumPy scalars and arrays"""
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+
+# Response class for the large JSON payloads of the API endpoints
+API_RESPONSE_CLASS = FastJSONResponse if ORJSON_AVAILABLE else JSONResponse
+
+# Static file types worth sending gzipped
+_COMPRESSIBLE_STATIC = frozenset(['.css', '.js', '.svg', '.json', '.txt', '.html'])
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles that lets browsers reuse assets for max_age seconds
+    
+    Asset URLs are not content-hashed, so the lifetime is kept short rather
+    than immutable; revalidation after expiry still gets a 304 via ETag.
+    Text assets are gzipped once per file version and then served from
+    memory to clients that accept gzip.
+    """
+    def __init__(self, *args, max_age: int = 3600, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_control = f"public, max-age={max_age}"
+        # {path: ((mtime_ns, size), gzipped body)}
+        self._gzip_cache: Dict[str, Tuple[Tuple[int, int], bytes]] = {}
+    
+    def file_response(self, full_path, stat_result: os.stat_result, scope, status_code: int = 200) -> Response:
+        compressible = os.path.splitext(full_path)[1] in _COMPRESSIBLE_STATIC
+        request_headers = Headers(scope=scope)
+        if (compressible and status_code == 200
+                and 'gzip' in _accepted_encodings(request_headers.get('accept-encoding', ''))):
+            response = self._gzip_response(str(full_path), stat_result)
+            if self.is_not_modified(response.headers, request_headers):
+                return NotModifiedResponse(response.headers)
+            return response
+        
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        response.headers["Cache-Control"] = self.cache_control
+        if compressible:
+            response.headers["Vary"] = "Accept-Encoding"
+        return response
+    
+    def _gzip_response(self, full_path: str, stat_result: os.stat_result) -> Response:
+        """Gzipped response for a static file, compressing it only when it changed"""
+        version = (stat_result.st_mtime_ns, stat_result.st_size)
+        cached = self._gzip_cache.get(full_path)
+        if cached is None or cached[0] != version:
+            with open(full_path, 'rb') as f:
+                cached = (version, gzip.compress(f.read(), compresslevel=9, mtime=0))
+            self._gzip_cache[full_path] = cached
+        
+        # Same validators as FileResponse, with the ETag marked as the gzip variant
+        etag_base = f"{stat_result.st_mtime}-{stat_result.st_size}"
+        etag = hashlib.md5(etag_base.encode(), usedforsecurity=False).hexdigest()
+        return Response(cached[1], media_type=mimetypes.guess_type(full_path)[0] or "text/plain", headers={
+            "Content-Encoding": "gzip",
+            "Vary": "Accept-Encoding",
+            "Cache-Control": self.cache_control,
+            "ETag": f'"{etag}-gzip"',
+            "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True),
+        })
+
+# Mount static files (CSS, JS, images). Deployments that serve /static from
+# a reverse proxy or CDN can skip the mount with SERVE_STATIC=0.
+if os.getenv("SERVE_STATIC", "1") == "1":
+    app.mount("/static", CachedStaticFiles(directory="static",
+                                           max_age=int(os.getenv("STATIC_MAX_AGE", "3600"))),
+              name="static")
+
+# Templates are compiled once per process: no mtime check on each render,
+# no eviction from the (small, fixed) template set, and compiled bytecode is
+# reused across restarts
+_jinja_cache_dir = os.getenv("JINJA_CACHE_DIR", ".jinja_cache")
+os.makedirs(_jinja_cache_dir, exist_ok=True)
+templates = Jinja2Templates(env=Environment(
+    loader=FileSystemLoader("templates"),
+    autoescape=select_autoescape(),
+    auto_reload=False,
+    cache_size=-1,
+    bytecode_cache=FileSystemBytecodeCache(_jinja_cache_dir),
+))
+
+# Warm the template cache so the first request of each page doesn't compile
+for _template_name in templates.env.list_templates(extensions=["html"]):
+    templates.get_template(_template_name)
+
+# Rendered pages by (template name, language), each stored as
+# (etag, {content-coding: body}). A page depends only on its language and its
+# own path, so it is rendered and compressed once and then served as bytes.
+_page_cache: Dict[Tuple[str, str], Tuple[str, Dict[str, bytes]]] = {}
+
+# Browser caching for rendered pages. The language comes from the cookie or
+# Accept-Language, so both are listed in Vary.
+_PAGE_CACHE_CONTROL = "public, max-age=300, stale-while-revalidate=86400"
+_PAGE_VARY = "Accept-Encoding, Accept-Language, Cookie"
+
+# Precompressed codings in server preference order
+_PAGE_ENCODINGS = ('br', 'gzip') if BROTLI_AVAILABLE else ('gzip',)
+
+def _compress_page(page: bytes) -> Dict[str, bytes]:
+    """Return a page body under every content-coding we can serve"""
+    bodies = {'identity': page, 'gzip': gzip.compress(page, compresslevel=9, mtime=0)}
+    if BROTLI_AVAILABLE:
+        bodies['br'] = brotli.compress(page, quality=5)
+    return bodies
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Whether an If-None-Match header lists etag (weak comparison) or is a wildcard"""
+    if if_none_match.strip() == '*':
+        return True
+    return any(tag.strip().removeprefix('W/') == etag for tag in if_none_match.split(','))
+
+def _accepted_encodings(accept_encoding: str) -> set:
+    """Content-codings listed in an Accept-Encoding header, minus those with q=0"""
+    accepted = set()
+    for item in accept_encoding.split(','):
+        coding, _, params = item.partition(';')
+        params = params.strip().lower()
+        if params.startswith('q='):
+            try:
+                if float(params[2:]) == 0:
+                    continue
+            except ValueError:
+                pass
+        accepted.add(coding.strip().lower())
+    return accepted
+
+def _cached_page(request: Request, template_name: str, lang_context: dict) -> Tuple[str, Dict[str, bytes]]:
+    """(etag, bodies) of a page without extra context, rendered on first use"""
+    key = (template_name, lang_context['current_language'])
+    cached = _page_cache.get(key)
+    if cached is None:
+        page = templates.get_template(template_name).render({**lang_context, 'request': request}).encode('utf-8')
+        cached = _page_cache[key] = (hashlib.blake2b(page, digest_size=16).hexdigest(), _compress_page(page))
+    return cached
 
 def render_template(request: Request, template_name: str, context: dict = None):
-    """Helper function to render templates with content support"""
-    if context is None:
-        context = {}
+    """Helper function to render templates with content support
     
+    Pages rendered without extra context are cached per language and sent
+    precompressed when the client accepts it.
+    """
     # Get language and content context
-    lang_context = content_loader.get_language_context(request)
-    context.update(lang_context)
+    loader = get_content_loader()
+    lang_context = loader.get_language_context_by_lang(loader.get_language_from_request(request))
     
-    # Add request to context
-    context['request'] = request
+    if context:
+        page = templates.get_template(template_name).render({**context, **lang_context, 'request': request})
+        return HTMLResponse(page)
     
-    return templates.TemplateResponse(template_name, context)
+    etag, bodies = _cached_page(request, template_name, lang_context)
+    
+    encoding = 'identity'
+    accept_encoding = request.headers.get('accept-encoding')
+    if accept_encoding:
+        accepted = _accepted_encodings(accept_encoding)
+        encoding = next((coding for coding in _PAGE_ENCODINGS if coding in accepted), 'identity')
+    
+    # Each coding is its own representation, so it gets its own ETag
+    headers = {
+        'ETag': f'"{etag}"' if encoding == 'identity' else f'"{etag}-{encoding}"',
+        'Cache-Control': _PAGE_CACHE_CONTROL,
+        'Vary': _PAGE_VARY
+    }
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match and _etag_matches(if_none_match, headers['ETag']):
+        return Response(status_code=304, headers=headers)
+    if encoding != 'identity':
+        headers['Content-Encoding'] = encoding
+    return HTMLResponse(bodies[encoding], headers=headers)
+
+# Path and template of every page route served from _page_cache
+PAGES = (
+    ("/", "index.html"),
+    ("/risk-assessment", "risk_assessment.html"),
+    ("/methodology", "methodology.html"),
+    ("/education", "education.html"),
+    ("/pricing", "pricing.html"),
+    ("/faq", "faq.html"),
+    ("/legal/disclaimers", "legal/disclaimers.html"),
+    ("/support", "support.html"),
+)
+
+def prerender_pages(max_workers: int = 8):
+    """Render and compress every page in every language into _page_cache
+    
+    Run at startup so the first visitor of each page is served from cache.
+    Templates only read request.url.path, so a bare GET scope for the page's
+    path stands in for a real request.
+    """
+    start = time.perf_counter()
+    loader = get_content_loader()
+    
+    def prerender(page_and_lang):
+        (path, template_name), lang = page_and_lang
+        request = Request({'type': 'http', 'method': 'GET', 'path': path, 'query_string': b'', 'headers': []})
+        _cached_page(request, template_name, loader.get_language_context_by_lang(lang))
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(prerender, itertools.product(PAGES, LANGUAGES)))
+    logger.info("Prerendered %d pages in %.0f ms", len(PAGES) * len(LANGUAGES),
+                (time.perf_counter() - start) * 1000)
+
+# Shared portfolio optimizer, created on first use. Building it loads and
+# converts all market data, so it must not happen per request.
+_portfolio_optimizer: Optional[SortinoPortfolioOptimizer] = None
+
+def get_portfolio_optimizer() -> SortinoPortfolioOptimizer:
+    """Return the shared SortinoPortfolioOptimizer, loading market data on first call
+    
+    Call it on the event-loop thread: the optimizer is then fully built and
+    prepared before any worker thread runs optimize_portfolio on it.
+    """
+    global _portfolio_optimizer
+    if _portfolio_optimizer is None:
+        _portfolio_optimizer = SortinoPortfolioOptimizer()
+    return _portfolio_optimizer
+
+# Rendered /api/calculate-portfolio bodies keyed on the raw form inputs, so a
+# re-submitted questionnaire skips KYC scoring, optimization and encoding.
+# Entries expire after PORTFOLIO_CACHE_TTL seconds; the oldest entry is
+# evicted once PORTFOLIO_CACHE_SIZE is reached.
+_portfolio_response_cache: Dict[tuple, Tuple[float, bytes]] = {}
+PORTFOLIO_CACHE_TTL = float(os.getenv("PORTFOLIO_CACHE_TTL", "3600"))
+PORTFOLIO_CACHE_SIZE = int(os.getenv("PORTFOLIO_CACHE_SIZE", "1024"))
+
+def _cached_portfolio_response(key: tuple) -> Optional[Response]:
+    """Cached response body for key, or None when missing or expired"""
+    cached = _portfolio_response_cache.get(key)
+    if cached is None:
+        return None
+    expires, body = cached
+    if expires < time.monotonic():
+        _portfolio_response_cache.pop(key, None)
+        return None
+    return Response(content=body, media_type=API_RESPONSE_CLASS.media_type)
+
+def _store_portfolio_response(key: tuple, response: Response):
+    """Remember a rendered response body for key"""
+    if PORTFOLIO_CACHE_TTL <= 0 or PORTFOLIO_CACHE_SIZE <= 0:
+        return
+    if key not in _portfolio_response_cache and len(_portfolio_response_cache) >= PORTFOLIO_CACHE_SIZE:
+        # Dicts keep insertion order, so the first key is the oldest entry
+        _portfolio_response_cache.pop(next(iter(_portfolio_response_cache)), None)
+    _portfolio_response_cache[key] = (time.monotonic() + PORTFOLIO_CACHE_TTL, response.body)
+
+@functools.lru_cache(maxsize=None)
+def _asset_categories(data_manager) -> Dict[str, str]:
+    """Asset name -> category for a data manager's assets, built once per data manager"""
+    return {asset_name: metadata.category
+            for asset_name, metadata in data_manager.asset_metadata.items() if metadata}
 
 def get_category_breakdown(allocation_percentages, data_manager):
     """Helper function to calculate category breakdown"""
-    category_breakdown = {}
+    asset_categories = _asset_categories(data_manager)
+    category_breakdown = defaultdict(float)
     
+    # Assets without metadata are left out of the breakdown
     for asset_name, weight in allocation_percentages.items():
-        metadata = data_manager.asset_metadata.get(asset_name)
-        if metadata:
-            category = metadata.category
-            if category not in category_breakdown:
-                category_breakdown[category] = 0
+        category = asset_categories.get(asset_name)
+        if category is not None:
             category_breakdown[category] += weight
     
     # Convert to percentages and round
     return {cat: round(weight * 100, 1) for cat, weight in category_breakdown.items()}
 
+def inconsistencies_payload(inconsistencies):
+    """JSON-ready list of KYC inconsistencies"""
+    return [
+        {
+            "type": inc.type.value,
+            "message": inc.message_english,
+            "severity": inc.severity
+        }
+        for inc in inconsistencies
+    ]
+
+def portfolio_payload(kyc_result, result, data_manager, investment_amount, investment_duration):
+    """Build the /api/calculate-portfolio response from a KYC profile and optimization result"""
+    # Round the 2-decimal metrics in one vectorized call
+    expected_return, volatility, sharpe, cvar_95, max_drawdown, risk_free_rate = np.round([
+        result.expected_return_annual * 100,
+        result.volatility_annual * 100,
+        result.sharpe_ratio,
+        result.cvar_95 * 100,
+        result.max_drawdown * 100,
+        result.risk_free_rate_used * 100
+    ], 2).tolist()
+    
+    return {
+        "risk_assessment": {
+            "category": kyc_result.category_english,
+            "category_hebrew": kyc_result.category_hebrew,
+            "composite_score": kyc_result.composite_score,
+            "risk_level": kyc_result.risk_level
+        },
+        "investment_details": {
+            "amount_ils": investment_amount,
+            "duration_years": investment_duration,
+            "currency": result.currency
+        },
+        "portfolio_allocation": {
+            "percentages": result.allocation_percentages,
+            "amounts_ils": result.allocation_ils_amounts,
+            "total_invested": result.total_investment_ils
+        },
+        "performance_metrics": {
+            "expected_return_annual": expected_return,
+            "volatility_annual": volatility,
+            "sharpe_ratio": sharpe,
+            "cvar_95": cvar_95,
+            "max_drawdown": max_drawdown,
+            "risk_free_rate": risk_free_rate,
+            "concentration_hhi": round(result.concentration_hhi, 3)
+        },
+        "risk_analysis": {
+            "risk_contributions": result.risk_contributions,
+            "category_breakdown": get_category_breakdown(result.allocation_percentages, data_manager)
+        },
+        "optimization_info": {
+            "success": result.optimization_success,
+            "time_ms": round(result.optimization_time_ms, 1),
+            "risk_category": result.risk_category
+        },
+        "performance_history": result.performance_history,
+        "kyc_inconsistencies": inconsistencies_payload(kyc_result.inconsistencies)
+    }
+
 @app.get("/health")
 async def health():
     return {"status": "ok"}
@@ -50,15 +395,25 @@ async def health():
 async def reload_content():
     """Development endpoint to reload content files"""
     try:
-        content_loader.reload_content()
+        get_content_loader().reload_content()
+        _page_cache.clear()
         return {"status": "success", "message": "Content reloaded successfully"}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
+def _local_redirect_path(redirect_to: str) -> str:
+    """redirect_to if it is a path on this site, else "/" (no open redirects)"""
+    # Browsers treat "/\host" like "//host" and drop tabs and newlines, so
+    # both are rejected along with protocol-relative and absolute URLs
+    if (not redirect_to.startswith('/') or redirect_to.startswith('//')
+            or '\\' in redirect_to or not redirect_to.isprintable()):
+        return '/'
+    return redirect_to
+
 @app.get("/set-language")
 async def set_language(request: Request, lang: str, redirect_to: str = "/"):
     """Set language preference and redirect"""
-    response = HTMLResponse(content="<script>window.location.href='" + redirect_to + "';</script>")
+    response = RedirectResponse(url=_local_redirect_path(redirect_to), status_code=303)
     if lang in LANGUAGES:
         response.set_cookie(key="language", value=lang, max_age=30*24*60*60)  # 30 days
     return response
@@ -95,7 +450,7 @@ async def legal_disclaimers(request: Request):
 async def support(request: Request):
     return render_template(request, "support.html")
 
-@app.post("/api/calculate-portfolio")
+@app.post("/api/calculate-portfolio", response_class=API_RESPONSE_CLASS)
 async def calculate_portfolio(
     # KYC Responses (replacing risk_level)
     horizon_score: int = Form(...),
@@ -108,12 +463,16 @@ async def calculate_portfolio(
     investment_amount: float = Form(...),
     investment_duration: float = Form(10.0)
 ):
-    import traceback
+    # Every response field derives from these inputs, so identical
+    # submissions get the identical body
+    cache_key = (horizon_score, loss_tolerance, experience_score, financial_score,
+                 goal_score, sleep_score, investment_amount, investment_duration)
+    cached = _cached_portfolio_response(cache_key)
+    if cached is not None:
+        return cached
     
     try:
         # Process KYC responses first
-        from kyc import KYCRiskAssessor
-        
         kyc_responses = {
             'horizon_score': horizon_score,
             'loss_tolerance': loss_tolerance,
@@ -123,102 +482,65 @@ async def calculate_portfolio(
             'sleep_score': sleep_score
         }
         
-        kyc_assessor = KYCRiskAssessor()
-        kyc_result = kyc_assessor.process_responses(kyc_responses)
+        kyc_result = DEFAULT_ASSESSOR.process_responses(kyc_responses)
         
-        print(f"KYC Assessment: {kyc_result.category_english}, risk_level={kyc_result.risk_level}")
+        logger.debug("KYC Assessment: %s, risk_level=%s", kyc_result.category_english, kyc_result.risk_level)
         
         # Check for error-level inconsistencies (block portfolio calculation)
         if not kyc_result.is_consistent():
             error_inconsistencies = [inc for inc in kyc_result.inconsistencies if inc.severity == 'error']
             if error_inconsistencies:
-                return {
+                return API_RESPONSE_CLASS({
                     "error": "inconsistent_responses",
                     "error_type": "blocking_inconsistencies", 
                     "kyc_profile": {
                         "category": kyc_result.category_english,
-                        "inconsistencies": [
-                            {
-                                "type": inc.type.value,
-                                "message": inc.message_english,
-                                "severity": inc.severity
-                            }
-                            for inc in error_inconsistencies
-                        ]
+                        "inconsistencies": inconsistencies_payload(error_inconsistencies)
                     }
-                }
+                })
         
-        print(f"Starting optimization for {kyc_result.category_english} (score: {kyc_result.composite_score:.1f})")
-        print(f"Investment: ILS {investment_amount:,.0f}, Duration: {investment_duration} years")
+        logger.debug("Starting optimization for %s (score: %.1f)", kyc_result.category_english, kyc_result.composite_score)
+        logger.debug("Investment: ILS %.0f, Duration: %s years", investment_amount, investment_duration)
         
-        from portfolio.sortino_adapter import SortinoPortfolioOptimizer
+        # Sortino optimizer (better performance for aggressive investors)
+        optimizer = get_portfolio_optimizer()
         
-        # Initialize Sortino optimizer (better performance for aggressive investors)
-        optimizer = SortinoPortfolioOptimizer()
-        
-        # Optimize portfolio using complete KYC response
-        result = optimizer.optimize_portfolio(
+        # Optimize portfolio using complete KYC response. The solve is CPU
+        # bound, so it runs on a worker thread to keep the event loop free
+        # for other requests; NumPy and SciPy release the GIL in their kernels
+        result = await asyncio.to_thread(
+            optimizer.optimize_portfolio,
             kyc_response=kyc_result,
             investment_amount=investment_amount,
             investment_duration_years=investment_duration
         )
         
-        print(f"Optimization completed: {result.optimization_success} ({result.optimization_time_ms:.0f}ms)")
-        print(f"Expected return: {result.expected_return_annual:.1%}, Volatility: {result.volatility_annual:.1%}")
-        print(f"CVaR 95%: {result.cvar_95:.1%}, Max Drawdown: {result.max_drawdown:.1%}")
+        logger.debug("Optimization completed: %s (%.0fms)", result.optimization_success, result.optimization_time_ms)
+        logger.debug("Expected return: %.1f%%, Volatility: %.1f%%",
+                     result.expected_return_annual * 100, result.volatility_annual * 100)
+        logger.debug("CVaR 95%%: %.1f%%, Max Drawdown: %.1f%%", result.cvar_95 * 100, result.max_drawdown * 100)
         
-        return {
-            "risk_assessment": {
-                "category": kyc_result.category_english,
-                "category_hebrew": kyc_result.category_hebrew,
-                "composite_score": kyc_result.composite_score,
-                "risk_level": kyc_result.risk_level
-            },
-            "investment_details": {
-                "amount_ils": investment_amount,
-                "duration_years": investment_duration,
-                "currency": result.currency
-            },
-            "portfolio_allocation": {
-                "percentages": result.allocation_percentages,
-                "amounts_ils": result.allocation_ils_amounts,
-                "total_invested": result.total_investment_ils
-            },
-            "performance_metrics": {
-                "expected_return_annual": round(result.expected_return_annual * 100, 2),
-                "volatility_annual": round(result.volatility_annual * 100, 2),
-                "sharpe_ratio": round(result.sharpe_ratio, 2),
-                "cvar_95": round(result.cvar_95 * 100, 2),
-                "max_drawdown": round(result.max_drawdown * 100, 2),
-                "risk_free_rate": round(result.risk_free_rate_used * 100, 2),
-                "concentration_hhi": round(result.concentration_hhi, 3)
-            },
-            "risk_analysis": {
-                "risk_contributions": result.risk_contributions,
-                "category_breakdown": get_category_breakdown(result.allocation_percentages, optimizer.data_manager)
-            },
-            "optimization_info": {
-                "success": result.optimization_success,
-                "time_ms": round(result.optimization_time_ms, 1),
-                "risk_category": result.risk_category
-            },
-            "performance_history": result.performance_history,
-            "kyc_inconsistencies": [
-                {
-                    "type": inc.type.value,
-                    "message": inc.message_english,
-                    "severity": inc.severity
-                }
-                for inc in kyc_result.inconsistencies
-            ] if kyc_result.inconsistencies else []
-        }
+        # Payloads are returned as response objects so FastAPI skips its
+        # jsonable_encoder pass; every value is already JSON-native or a
+        # NumPy float64, which both response classes serialize directly
+        # Blocking-inconsistency replies above are cheap and are not cached
+        response = API_RESPONSE_CLASS(portfolio_payload(
+            kyc_result, result, optimizer.data_manager, investment_amount, investment_duration
+        ))
+        _store_portfolio_response(cache_key, response)
+        return response
         
     except Exception as e:
-        print(f"ERROR in portfolio calculation: {e}")
-        print(f"Traceback: {traceback.format_exc()}")
-        raise e  # Re-raise to see the full error
+        # The traceback is formatted once, by our log handler; a plain 500
+        # keeps the server from logging it a second time
+        logger.exception("ERROR in portfolio calculation: %s", e)
+        raise HTTPException(status_code=500, detail="optimization_failed") from e
 
 if __name__ == "__main__":
-    import os
     port = int(os.environ.get("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
\ No newline at end of file
+    workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+    # "auto" picks uvloop and httptools when they are installed (both come
+    # with uvicorn[standard]) and falls back to asyncio and h11 otherwise.
+    # Multiple workers need an import string rather than the app object.
+    uvicorn.run("main:app" if workers > 1 else app, host="0.0.0.0", port=port,
+                loop="auto", http="auto", workers=workers)
\ No newline at end of file
@@ -60,30 +60,26 @@ def analyze_optimization_problem():
     print(" AVAILABLE ASSETS AND THEIR PERFORMANCE")
     print("="*80)
     
-    # Get asset performance
-    assets_data = []
-    for asset in optimizer.data_manager.get_asset_names():
-        returns = optimizer.data_manager.returns_data[asset]
-        annual_return = returns.mean() * 12
-        annual_vol = returns.std() * np.sqrt(12)
-        rf = optimizer.data_manager.risk_free_rate.mean()
-        sharpe = (annual_return - rf) / annual_vol if annual_vol > 0 else 0
-        
-        assets_data.append({
-            'name': asset,
-            'return': annual_return,
-            'volatility': annual_vol,
-            'sharpe': sharpe
-        })
-    
-    # Sort by return
-    assets_data.sort(key=lambda x: x['return'], reverse=True)
+    # Get asset performance for all assets in one pass over the
+    # (months x assets) returns matrix
+    names = optimizer.data_manager.get_asset_names()
+    returns = optimizer.data_manager.returns_data[names].to_numpy(dtype=np.float64)
+    annual_returns = returns.mean(axis=0) * 12
+    annual_vols = returns.std(axis=0, ddof=1) * np.sqrt(12)
+    rf = optimizer.data_manager.risk_free_rate.mean()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpes = np.where(annual_vols > 0, (annual_returns - rf) / annual_vols, 0.0)
+    
+    # Top 10 by return: partition out the largest returns, then sort only those
+    n_top = min(10, len(names))
+    top_idx = np.argpartition(-annual_returns, n_top - 1)[:n_top]
+    top_idx = top_idx[np.argsort(-annual_returns[top_idx])]
     
     print("\nTop 10 Assets by Return:")
     print(f"{'Asset':<30} {'Return':>10} {'Volatility':>12} {'Sharpe':>10}")
     print("-"*65)
-    for asset in assets_data[:10]:
-        print(f"{asset['name']:<30} {asset['return']*100:>9.1f}% {asset['volatility']*100:>11.1f}% {asset['sharpe']:>10.2f}")
+    for i in top_idx:
+        print(f"{names[i]:<30} {annual_returns[i]*100:>9.1f}% {annual_vols[i]*100:>11.1f}% {sharpes[i]:>10.2f}")
     
     print("\n" + "="*80)
     print(" KEY ISSUES WITH THE OPTIMIZATION")
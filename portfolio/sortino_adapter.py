@@ -5,6 +5,7 @@ This adapter wraps the SortinoOptimizer to provide the same interface
 and output format as the UnifiedPortfolioOptimizer.
 """
 
+import functools
 import numpy as np
 from dataclasses import dataclass
 from typing import Dict, Optional
@@ -58,6 +59,21 @@ class SortinoPortfolioOptimizer:
         """Initialize with data manager"""
         self.data_manager = data_manager or ILSDataManager()
         self.optimizer = SortinoOptimizer(self.data_manager)
+        # Prepared here, on the constructing thread, so concurrent
+        # optimize_portfolio calls never race on the lazy prepare()
+        self.optimizer.prepare()
+        
+        # Values that depend only on the loaded market data, computed once
+        # and shared by every optimize_portfolio call
+        returns = self.data_manager.returns_data
+        self._asset_vols = {asset: returns[asset].std() * np.sqrt(12) for asset in returns.columns}
+        self._risk_free_rate_mean = self.data_manager.risk_free_rate.mean()
+        self._dates = returns.index.strftime('%Y-%m-%d').tolist()
+        
+        # Everything optimize_portfolio derives from the optimization itself
+        # is independent of the investment amount, so it is cached per
+        # aggressiveness and only scaled by the amount per call
+        self._analyze_cached = functools.lru_cache(maxsize=128)(self._analyze)
         
     def optimize_portfolio(self, 
                           kyc_response: RiskProfile,
@@ -81,50 +97,41 @@ class SortinoPortfolioOptimizer:
         # KYC composite score is 0-100, we map to 0-1
         aggressiveness = kyc_response.composite_score / 100.0
         
-        # Run Sortino optimization
-        result = self.optimizer.optimize(aggressiveness)
+        analysis = self._analyze_cached(aggressiveness)
+        result = analysis['result']
+        weights = dict(result['weights'])
         
-        # Calculate ILS amounts for each asset
-        allocation_ils_amounts = {}
-        for asset, weight in result['weights'].items():
-            allocation_ils_amounts[asset] = weight * investment_amount
-            
-        # Calculate risk contributions (simplified - proportional to weight * volatility)
-        risk_contributions = self._calculate_risk_contributions(result['weights'])
+        # Calculate ILS amounts for each asset in one vectorized multiply
+        allocation_ils_amounts = dict(zip(weights, (analysis['weights_array'] * investment_amount).tolist()))
         
-        # Calculate concentration (HHI)
-        weights_array = np.array(list(result['weights'].values()))
-        concentration_hhi = np.sum(weights_array ** 2)
-        
-        # Calculate CVaR (using historical approach)
-        cvar_95 = self._calculate_cvar(result['weights'])
-
         # Calculate historical performance
-        performance_history = self.calculate_portfolio_performance(result['weights'], investment_amount)
+        performance_history = self._performance_data(
+            analysis['portfolio_returns'], analysis['cumulative_returns'], investment_amount
+        )
 
         # Build result matching expected format
         optimization_time = (time.time() - start_time) * 1000
         
         return OptimizationResult(
             # Allocation results
-            allocation_percentages=result['weights'],
+            allocation_percentages=weights,
             allocation_ils_amounts=allocation_ils_amounts,
             
             # Portfolio metrics
             expected_return_annual=result['expected_return'],
             volatility_annual=result['volatility'],
             sharpe_ratio=result['sharpe_ratio'],
-            cvar_95=cvar_95,
+            cvar_95=analysis['cvar_95'],
             max_drawdown=result['max_drawdown'],
             
             # Risk analysis
-            risk_contributions=risk_contributions,
-            concentration_hhi=concentration_hhi,
+            risk_contributions=dict(analysis['risk_contributions']),
+            concentration_hhi=analysis['concentration_hhi'],
             
             # Additional fields
             total_investment_ils=investment_amount,
             currency='ILS',
-            risk_free_rate_used=self.data_manager.risk_free_rate.mean(),
+            risk_free_rate_used=self._risk_free_rate_mean,
             optimization_success=result.get('optimization_success', True),
             optimization_time_ms=optimization_time,
             risk_category=kyc_response.category_english,
@@ -134,6 +141,31 @@ class SortinoPortfolioOptimizer:
             performance_history=performance_history
         )
     
+    def _analyze(self, aggressiveness: float) -> Dict:
+        """
+        Optimize for an aggressiveness and compute the amount-independent
+        analysis of the result. Cached per aggressiveness; callers must copy
+        anything they hand out.
+        """
+        # Run Sortino optimization
+        result = self.optimizer.optimize(aggressiveness)
+        
+        weights_array = np.fromiter(result['weights'].values(), dtype=np.float64, count=len(result['weights']))
+        portfolio_returns, cumulative_returns = self._performance_curve(result['weights'])
+        
+        return {
+            'result': result,
+            'weights_array': weights_array,
+            # Calculate risk contributions (simplified - proportional to weight * volatility)
+            'risk_contributions': self._calculate_risk_contributions(result['weights']),
+            # Calculate concentration (HHI)
+            'concentration_hhi': np.sum(weights_array ** 2),
+            # Calculate CVaR (using historical approach)
+            'cvar_95': self._calculate_cvar(result['weights']),
+            'portfolio_returns': portfolio_returns,
+            'cumulative_returns': cumulative_returns
+        }
+    
     def _calculate_risk_contributions(self, weights: Dict[str, float]) -> Dict[str, float]:
         """
         Calculate risk contribution of each asset to portfolio.
@@ -145,9 +177,8 @@ class SortinoPortfolioOptimizer:
         
         # First pass: calculate weighted risks
         for asset, weight in weights.items():
-            if weight > 0.001 and asset in self.data_manager.returns_data.columns:
-                asset_vol = self.data_manager.returns_data[asset].std() * np.sqrt(12)
-                weighted_risk = weight * asset_vol
+            if weight > 0.001 and asset in self._asset_vols:
+                weighted_risk = weight * self._asset_vols[asset]
                 risk_contributions[asset] = weighted_risk
                 total_risk += weighted_risk
         
@@ -199,6 +230,11 @@ class SortinoPortfolioOptimizer:
         Returns:
             Dictionary with dates and portfolio values over time
         """
+        portfolio_returns, cumulative_returns = self._performance_curve(weights)
+        return self._performance_data(portfolio_returns, cumulative_returns, investment_amount)
+    
+    def _performance_curve(self, weights: Dict[str, float]):
+        """Monthly portfolio returns and their cumulative growth factor"""
         # Create weight array aligned with returns data
         weight_array = np.zeros(len(self.data_manager.returns_data.columns))
         for i, asset in enumerate(self.data_manager.returns_data.columns):
@@ -208,13 +244,17 @@ class SortinoPortfolioOptimizer:
         # Calculate portfolio returns over time
         portfolio_returns = self.data_manager.returns_data @ weight_array
 
-        # Calculate cumulative portfolio value starting with investment amount
+        # Calculate cumulative portfolio growth
         cumulative_returns = (1 + portfolio_returns).cumprod()
+        return portfolio_returns, cumulative_returns
+    
+    def _performance_data(self, portfolio_returns, cumulative_returns, investment_amount: float) -> Dict:
+        """Performance history dict for a curve, scaled to investment_amount"""
         portfolio_values = investment_amount * cumulative_returns
 
         # Create performance data with dates
         performance_data = {
-            'dates': portfolio_returns.index.strftime('%Y-%m-%d').tolist(),
+            'dates': list(self._dates),
             'values': portfolio_values.tolist(),
             'returns': portfolio_returns.tolist(),
             'initial_investment': investment_amount,
@@ -223,4 +263,4 @@ class SortinoPortfolioOptimizer:
             'years': len(portfolio_returns) / 12.0
         }
 
-        return performance_data
\ No newline at end of file
+        return performance_data
@@ -9,6 +9,7 @@ A clean, simple optimizer that:
 This replaces the overly complex utility function approach.
 """
 
+import functools
 import numpy as np
 import pandas as pd
 from scipy.optimize import minimize
@@ -16,8 +17,45 @@ from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 import logging
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+
+def _max_drawdown_numpy(portfolio_returns: np.ndarray) -> float:
+    """Maximum drawdown of a return series via cumprod and running max"""
+    cumulative = np.cumprod(1 + portfolio_returns)
+    running_max = np.maximum.accumulate(cumulative)
+    drawdown = (cumulative - running_max) / running_max
+    return abs(drawdown.min())
+
+
+def _max_drawdown_loop(portfolio_returns):
+    """Same as _max_drawdown_numpy in one fused scan, for Numba to compile"""
+    cumulative = 1.0
+    running_max = 0.0
+    min_drawdown = 0.0
+    for i in range(portfolio_returns.size):
+        cumulative *= 1 + portfolio_returns[i]
+        if i == 0 or cumulative > running_max:
+            running_max = cumulative
+        drawdown = (cumulative - running_max) / running_max
+        if drawdown < min_drawdown:
+            min_drawdown = drawdown
+    return abs(min_drawdown)
+
+
+if NUMBA_AVAILABLE:
+    # Explicit signature compiles (or loads from cache) at import time, so
+    # the first optimization request doesn't pay for JIT warmup
+    _max_drawdown = njit('float64(float64[:])', cache=True)(_max_drawdown_loop)
+else:
+    _max_drawdown = _max_drawdown_numpy
+
 @dataclass
 class AssetClassification:
     """Classification of assets by risk level"""
@@ -72,6 +110,32 @@ class SortinoOptimizer:
         self.returns_data = data_manager.returns_data
         self.risk_free_rate = data_manager.risk_free_rate.mean()
         
+        # Aggressiveness-independent inputs, filled in by prepare()
+        self._returns_matrix = None
+        self._asset_names = None
+        self._optimize_cached = functools.lru_cache(maxsize=128)(self._optimize)
+        
+    def prepare(self):
+        """
+        Compute the inputs shared by every optimize() call.
+        
+        The objective and constraints are evaluated many times per SLSQP
+        run, so the returns matrix is pulled out of pandas once here rather
+        than going through DataFrame @ weights on every evaluation. Called
+        lazily by optimize(); call it up front to keep it out of the first
+        optimization's timing.
+        """
+        # optimize() checks _returns_matrix, so it is published last
+        self._optimize_cached.cache_clear()
+        self._asset_names = self.returns_data.columns.tolist()
+        self._returns_matrix = self.returns_data.to_numpy(dtype=np.float64)
+        
+    def _portfolio_returns(self, weights: np.ndarray) -> np.ndarray:
+        """Monthly portfolio returns for a weight vector"""
+        if self._returns_matrix is None:
+            self.prepare()
+        return self._returns_matrix @ weights
+        
     def calculate_weight_limit(self, aggressiveness: float, asset_name: str) -> float:
         """
         Calculate maximum weight for an asset based on aggressiveness.
@@ -139,7 +203,7 @@ class SortinoOptimizer:
         Sortino = (Return - Risk_free) / Downside_deviation
         """
         # Portfolio returns
-        portfolio_returns = self.returns_data @ weights
+        portfolio_returns = self._portfolio_returns(weights)
         
         # Expected return (annualized)
         expected_return = portfolio_returns.mean() * 12
@@ -147,7 +211,7 @@ class SortinoOptimizer:
         # Downside deviation (only negative returns)
         downside_returns = portfolio_returns[portfolio_returns < 0]
         if len(downside_returns) > 0:
-            downside_deviation = downside_returns.std() * np.sqrt(12)
+            downside_deviation = downside_returns.std(ddof=1) * np.sqrt(12)
         else:
             downside_deviation = 0.001  # Small value to avoid division by zero
         
@@ -161,21 +225,11 @@ class SortinoOptimizer:
         Calculate historical maximum drawdown for a portfolio.
         """
         # Portfolio returns
-        portfolio_returns = self.returns_data @ weights
+        portfolio_returns = self._portfolio_returns(weights)
         
-        # Cumulative returns
-        cumulative = (1 + portfolio_returns).cumprod()
-        
-        # Running maximum
-        running_max = cumulative.expanding().max()
-        
-        # Drawdown
-        drawdown = (cumulative - running_max) / running_max
-        
-        # Maximum drawdown (positive value)
-        max_drawdown = abs(drawdown.min())
-        
-        return max_drawdown
+        # Maximum drawdown (positive value) from cumulative returns and
+        # their running maximum
+        return _max_drawdown(portfolio_returns)
     
     def optimize(self, aggressiveness: float) -> Dict:
         """
@@ -187,8 +241,18 @@ class SortinoOptimizer:
         Returns:
             Dictionary with optimal weights and performance metrics
         """
-        n_assets = len(self.returns_data.columns)
-        asset_names = self.returns_data.columns.tolist()
+        if self._returns_matrix is None:
+            self.prepare()
+        
+        # Results are memoized per aggressiveness; copy so callers can't
+        # mutate the cached weights
+        result = self._optimize_cached(aggressiveness)
+        return {**result, 'weights': dict(result['weights'])}
+    
+    def _optimize(self, aggressiveness: float) -> Dict:
+        """Uncached optimize() implementation"""
+        n_assets = len(self._asset_names)
+        asset_names = self._asset_names
         
         # Get constraint parameters
         max_dd_limit = self.calculate_max_drawdown_limit(aggressiveness)
@@ -196,7 +260,7 @@ class SortinoOptimizer:
         # Objective: blend Sortino ratio with return for aggressive investors
         def objective(weights):
             sortino = self.calculate_sortino_ratio(weights)
-            portfolio_returns = self.returns_data @ weights
+            portfolio_returns = self._portfolio_returns(weights)
             expected_return = portfolio_returns.mean() * 12
             
             if aggressiveness >= 0.95:
@@ -251,9 +315,9 @@ class SortinoOptimizer:
             weights = result.x
         
         # Calculate performance metrics
-        portfolio_returns = self.returns_data @ weights
+        portfolio_returns = self._portfolio_returns(weights)
         annual_return = portfolio_returns.mean() * 12
-        annual_vol = portfolio_returns.std() * np.sqrt(12)
+        annual_vol = portfolio_returns.std(ddof=1) * np.sqrt(12)
         sharpe = (annual_return - self.risk_free_rate) / annual_vol
         sortino = self.calculate_sortino_ratio(weights)
         max_dd = self.calculate_max_drawdown(weights)
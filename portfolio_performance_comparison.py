@@ -170,8 +170,8 @@ class PortfolioComparator:
                     'CVaR_95': perf['cvar_95'],
                 }
                 # Add individual asset allocations
-                for asset_name in perf['allocation']:
-                    result_row[f'{asset_name}_%'] = perf['allocation'][asset_name] * 100
+                result_row.update({f'{asset_name}_%': weight * 100
+                                   for asset_name, weight in perf['allocation'].items()})
                 
                 results.append(result_row)
         
@@ -194,8 +194,8 @@ class PortfolioComparator:
                     'CVaR_95': perf['cvar_95'],
                 }
                 # Add individual asset allocations
-                for asset_name in perf['allocation']:
-                    result_row[f'{asset_name}_%'] = perf['allocation'][asset_name] * 100
+                result_row.update({f'{asset_name}_%': weight * 100
+                                   for asset_name, weight in perf['allocation'].items()})
                 
                 results.append(result_row)
                 
@@ -207,12 +207,10 @@ class PortfolioComparator:
         df = pd.DataFrame(results)
         
         # Ensure all asset columns exist and fill with 0 where missing
-        for asset in all_assets:
-            col_name = f'{asset}_%'
-            if col_name not in df.columns:
-                df[col_name] = 0.0
-            else:
-                df[col_name] = df[col_name].fillna(0.0)
+        asset_cols = [f'{asset}_%' for asset in all_assets]
+        missing_cols = [col for col in asset_cols if col not in df.columns]
+        df = df.assign(**dict.fromkeys(missing_cols, 0.0))
+        df[asset_cols] = df[asset_cols].fillna(0.0)
         
         # Sort by expected return (descending)
         df = df.sort_values('Expected_Return', ascending=False)
@@ -0,0 +1,48 @@
+"""
+Processed Price File Loader
+
+Reads the two-column (date, value) CSVs in processed_data/ into a date-indexed
+Series. Parsing uses the PyArrow engine when available, and the parsed result
+is cached as a Parquet file next to the CSV so re-runs skip text parsing.
+"""
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+CSV_ENGINE = 'pyarrow' if PYARROW_AVAILABLE else 'c'
+
+def read_price_file(csv_path, value_name):
+    """Read a date/value CSV as a Series, using a Parquet sidecar cache
+
+    The parsed series is written next to the CSV on first read and reused
+    for as long as it is newer than the CSV it was built from.
+    """
+    parquet_path = csv_path.with_suffix('.parquet')
+    if (PYARROW_AVAILABLE and parquet_path.exists()
+            and parquet_path.stat().st_mtime >= csv_path.stat().st_mtime):
+        return pd.read_parquet(parquet_path).iloc[:, 0].rename(value_name)
+
+    # Explicit columns and value dtype skip per-column type inference; values
+    # stay float64 since the debug pipeline compounds them over many periods
+    df = pd.read_csv(csv_path, engine=CSV_ENGINE, skiprows=1,
+                     names=['date', 'value'], usecols=[0, 1],
+                     dtype={'date': str, 'value': np.float64})
+    # Processed files use ISO dates, so skip per-row format inference
+    df['date'] = pd.to_datetime(df['date'], format='%Y-%m-%d', cache=True)
+    df = df.set_index('date')
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index()
+
+    if PYARROW_AVAILABLE:
+        try:
+            df.to_parquet(parquet_path, compression='zstd')
+        except OSError:
+            pass  # Read-only data directory, just skip caching
+
+    return df['value'].rename(value_name)
@@ -33,10 +33,20 @@ class TestAPIEndpoints:
         
     def test_language_switching(self, client):
         """Test language preference setting"""
-        response = client.get("/set-language?lang=he&redirect_to=/")
+        response = client.get("/set-language?lang=he&redirect_to=/faq", follow_redirects=False)
         
-        assert response.status_code == 200
-        assert "language" in response.cookies
+        assert response.status_code == 303
+        assert response.headers["location"] == "/faq"
+        assert response.cookies["language"] == "he"
+        
+    def test_language_switching_rejects_external_redirect(self, client):
+        """Test that set-language only redirects within the site"""
+        for target in ["https://evil.example", "//evil.example", "/\\evil.example", "/\t/evil.example"]:
+            response = client.get("/set-language", params={"lang": "en", "redirect_to": target},
+                                  follow_redirects=False)
+            
+            assert response.status_code == 303
+            assert response.headers["location"] == "/"
         
     @patch('main.KYCRiskAssessor')
     @patch('main.UnifiedPortfolioOptimizer')
@@ -224,10 +234,27 @@ class TestAPIEndpoints:
         assert "kyc_inconsistencies" in result
         assert len(result["kyc_inconsistencies"]) == 1
         assert result["kyc_inconsistencies"][0]["type"] == "SHORT_HORIZON_HIGH_RISK"
-        
+
+    def test_portfolio_calculation_repeat_is_cached(self, client):
+        """Test that an identical resubmission is answered from the response cache"""
+        form_data = {
+            "horizon_score": 4, "loss_tolerance": 3, "experience_score": 3,
+            "financial_score": 4, "goal_score": 3, "sleep_score": 3,
+            "investment_amount": 100000, "investment_duration": 10
+        }
+        first = client.post("/api/calculate-portfolio", data=form_data)
+
+        with patch('main.get_portfolio_optimizer') as mock_get_optimizer:
+            second = client.post("/api/calculate-portfolio", data=form_data)
+            mock_get_optimizer.assert_not_called()
+
+        assert first.status_code == 200
+        assert second.status_code == 200
+        assert second.content == first.content
+
     def test_content_reload_endpoint(self, client):
         """Test content reload endpoint"""
-        with patch('main.content_loader.reload_content'):
+        with patch('content_loader.ContentLoader.reload_content'):
             response = client.get("/reload-content")
             
             assert response.status_code == 200
@@ -2,9 +2,11 @@
 Unit tests for KYC risk assessment system
 """
 
+import numpy as np
 import pytest
+from kyc import constants, _fast
 from kyc.risk_assessor import KYCRiskAssessor
-from kyc.models import KYCResponse, RiskProfile, InconsistencyType
+from kyc.models import KYCResponse, RiskProfile, InconsistencyType, KYC_SCORE_FIELDS
 
 
 class TestKYCRiskAssessor:
@@ -204,4 +206,187 @@ class TestKYCRiskAssessor:
         assert len(result.inconsistencies) > 0
         
         # Adjusted score should be more conservative
-        assert result.composite_score < 70
\ No newline at end of file
+        assert result.composite_score < 70
+
+class TestRiskCategoryArrays:
+    """Test suite for the array view of RISK_CATEGORIES"""
+    
+    def test_arrays_match_category_dicts(self):
+        """Test that each array entry mirrors its category dict"""
+        for i, key in enumerate(constants.CATEGORY_KEYS):
+            category = constants.RISK_CATEGORIES[key]
+            assert (constants._SCORE_LO[i], constants._SCORE_HI[i]) == category['score_range']
+            assert constants._MAX_DD[i] == category['max_drawdown']
+            assert (constants._EQ_MIN[i], constants._EQ_MAX[i]) == category['equity_range']
+            
+    def test_classify_score(self):
+        """Test scalar and batch score classification"""
+        assert constants.CATEGORY_KEYS[constants.classify_score(0)] == 'שמרני_מאוד'
+        assert constants.CATEGORY_KEYS[constants.classify_score(55)] == 'מתון'
+        assert constants.CATEGORY_KEYS[constants.classify_score(100)] == 'אגרסיבי_מאוד'
+        
+        scores = np.array([10, 26, 45, 66, 86])
+        assert constants.classify_score(scores).tolist() == [0, 1, 1, 3, 4]
+        
+    def test_score_to_category(self):
+        """Test score to category key mapping, including clamping"""
+        assert constants.score_to_category(35) == 'שמרני'
+        assert constants.score_to_category(-5) == 'שמרני_מאוד'
+        assert constants.score_to_category(120) == 'אגרסיבי_מאוד'
+        
+        keys = constants.score_to_category(np.array([0, 45, 46, 85, 86]))
+        assert keys.tolist() == ['שמרני_מאוד', 'שמרני', 'מתון', 'אגרסיבי', 'אגרסיבי_מאוד']
+        
+    @pytest.mark.parametrize("kernel", [_fast.batch_assess, _fast._batch_assess_loop], ids=['compiled', 'loop'])
+    def test_batch_kernel_matches_constants(self, kernel):
+        """Test that the batch kernel classifies every 0.05 step like the constants helpers"""
+        assessor = KYCRiskAssessor()
+        scores = np.arange(2001) / 20
+        
+        _, category, level = kernel(
+            scores[:, None], np.ones(1), assessor._cat_lo, assessor._cat_hi,
+            constants._FALLBACK_INDEX, constants.FALLBACK_RISK_LEVEL, constants._LEVEL_UPPER,
+            constants._LEVEL_START, constants._LEVEL_WIDTH, constants._LEVEL_BASE, constants._LEVEL_SPAN
+        )
+        
+        assert category.tolist() == constants.classify_score(scores).tolist()
+        assert level.tolist() == constants.score_to_risk_level(scores).tolist()
+        assert level.tolist() == [constants.score_to_risk_level(float(score)) for score in scores]
+        
+    @pytest.mark.parametrize("score", [25.5, 45.5, 65.2, 85.9])
+    def test_gap_scores_fall_back(self, score):
+        """Test that scores between category ranges fall back like the assessor does"""
+        assert constants.score_to_category(score) == constants.FALLBACK_CATEGORY
+        assert constants.score_to_risk_level(score) == constants.FALLBACK_RISK_LEVEL
+        assert constants.score_to_category(np.array([score])).tolist() == [constants.FALLBACK_CATEGORY]
+        assert constants.score_to_risk_level(np.array([score])).tolist() == [constants.FALLBACK_RISK_LEVEL]
+        assert KYCRiskAssessor()._map_to_risk_category(score) == (constants.FALLBACK_CATEGORY,
+                                                                  constants.FALLBACK_RISK_LEVEL)
+
+
+class TestQuestionScores:
+    """Test suite for the KYC question score table"""
+    
+    def test_score_answer_matches_questions(self):
+        """Test that the score table mirrors every KYC_QUESTIONS option"""
+        for question, data in constants.KYC_QUESTIONS.items():
+            for option_idx, option in enumerate(data['options']):
+                assert constants.score_answer(question, option_idx) == option['score']
+        
+        with pytest.raises(ValueError):
+            constants.score_answer('loss_tolerance', 4)  # Only 4 options
+        with pytest.raises(ValueError):
+            constants.score_answer('unknown', 0)
+
+
+class TestKYCResponseBatch:
+    """Test suite for batch KYCResponse construction"""
+    
+    def test_from_arrays_matches_constructor(self):
+        """Test that batch-built responses equal individually built ones"""
+        scores = np.array([[10, 0, 20, 20, 0, 0], [100, 100, 100, 100, 100, 100]])
+        responses = KYCResponse.from_arrays(scores)
+        
+        assert responses == [KYCResponse(*row) for row in scores.tolist()]
+        
+    def test_from_arrays_rejects_out_of_range(self):
+        """Test that one bad score fails the whole batch"""
+        scores = np.array([[10, 0, 20, 20, 0, 0], [50, 50, 50, 50, 50, 101]])
+        
+        with pytest.raises(ValueError):
+            KYCResponse.from_arrays(scores)
+        
+    def test_batch_rules_match_lambdas(self):
+        """Test that the vectorized rule check agrees with each rule lambda"""
+        rng = np.random.default_rng(0)
+        scores = rng.integers(0, 101, size=(200, 6))
+        triggered = constants.evaluate_consistency_rules(scores)
+        
+        for response, row in zip(KYCResponse.from_arrays(scores), triggered):
+            expected = [rule['condition'](response) for rule in constants.CONSISTENCY_RULES.values()]
+            assert row.tolist() == expected
+        
+    def test_risk_profile_batch_matches_assessor(self):
+        """Test that batch classification matches single assessments"""
+        assessor = KYCRiskAssessor()
+        profiles = [
+            assessor.process_responses({field: score for field in KYC_SCORE_FIELDS})
+            for score in (10, 35, 55, 75, 95)
+        ]
+        batch = RiskProfile.from_batch(np.array([p.composite_score for p in profiles]))
+        
+        assert len(batch) == len(profiles)
+        for i, profile in enumerate(profiles):
+            assert batch.category_hebrew[i] == profile.category_hebrew
+            assert batch.risk_level[i] == profile.risk_level
+            assert batch.max_drawdown[i] == profile.max_drawdown
+            assert (batch.equity_min[i], batch.equity_max[i]) == profile.equity_range
+        
+    def test_risk_profile_batch_matches_assessor_on_fractional_scores(self):
+        """Test fractional scores, including those between category ranges"""
+        assessor = KYCRiskAssessor()
+        scores = np.array([25.0, 25.5, 26.0, 33.3, 45.5, 46.2, 65.2, 70.75, 85.9, 86.05, 99.95])
+        batch = RiskProfile.from_batch(scores)
+        
+        for score, category, level in zip(scores, batch.category_hebrew, batch.risk_level):
+            assert (category, level) == assessor._map_to_risk_category(float(score))
+        assert batch.category_hebrew[[1, 4, 6, 8]].tolist() == [constants.FALLBACK_CATEGORY] * 4
+        
+    def test_shared_assessment_timestamp(self):
+        """Test that a caller-supplied timestamp is used as-is"""
+        assessor = KYCRiskAssessor()
+        responses = {field: 50 for field in KYC_SCORE_FIELDS}
+        
+        result = assessor.process_responses(responses, assessment_timestamp='2025-01-01T00:00:00')
+        
+        assert result.assessment_timestamp == '2025-01-01T00:00:00'
+        
+    def test_process_batch_matches_single_assessments(self):
+        """Test that batch assessment equals assessing each response alone"""
+        assessor = KYCRiskAssessor()
+        rng = np.random.default_rng(0)
+        responses = [dict(zip(KYC_SCORE_FIELDS, row)) for row in rng.integers(0, 101, size=(300, 6)).tolist()]
+        
+        batch = assessor.process_batch(responses, assessment_timestamp='T')
+        single = [assessor.process_responses(r, assessment_timestamp='T') for r in responses]
+        
+        assert batch == single
+        
+    def test_process_batch_sums_like_single_assessment(self):
+        """Test a response whose composite rounds differently under compensated summation"""
+        assessor = KYCRiskAssessor()
+        response = dict(zip(KYC_SCORE_FIELDS, [63, 20, 79, 41, 23, 50]))
+        
+        expected = 0.0
+        for score, weight in zip([63, 20, 79, 41, 23], [0.25, 0.30, 0.20, 0.15, 0.10]):
+            expected += score * weight
+        single = assessor.process_responses(response, assessment_timestamp='T')
+        batch, = assessor.process_batch([response], assessment_timestamp='T')
+        
+        assert single.composite_score == batch.composite_score == expected
+        assert batch == single
+        
+    def test_process_batch_missing_field(self):
+        """Test that batch assessment reports missing fields"""
+        with pytest.raises(ValueError, match="Missing required field"):
+            KYCRiskAssessor().process_batch([{'horizon_score': 50}])
+
+    @pytest.mark.parametrize("field, value", [
+        ('horizon_score', 50.0),
+        ('loss_tolerance', "50"),
+        ('goal_score', np.int64(50)),
+        ('sleep_score', 101),
+        ('extra_field', 50),
+    ])
+    def test_process_batch_rejects_what_single_rejects(self, field, value):
+        """Test that batch and single assessment reject the same invalid responses"""
+        assessor = KYCRiskAssessor()
+        valid = {name: 50 for name in KYC_SCORE_FIELDS}
+        invalid = {**valid, field: value}
+
+        with pytest.raises(ValueError) as single_error:
+            assessor.process_responses(invalid)
+        with pytest.raises(ValueError) as batch_error:
+            assessor.process_batch([valid, invalid])
+
+        assert str(batch_error.value) == str(single_error.value)
@@ -0,0 +1,388 @@
+"""
+Unit tests for Portfolio Analytics kernels against the reference pandas implementations
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+from scipy import stats
+from portfolio.analytics import (
+    PortfolioAnalytics, _classify_regimes, _classify_regimes_loop, _classify_regimes_numpy, _REGIME_TYPES,
+    _return_statistics, _return_statistics_loop, _return_statistics_numpy,
+    _rolling_upper_correlations, _sliding_correlations, _upper_triangle, _value_at_risk
+)
+
+
+@pytest.fixture
+def history():
+    """Daily returns with a planted repeat of the latest month, a flat stretch and a gap"""
+    rng = np.random.default_rng(5)
+    returns = pd.Series(rng.normal(0.0004, 0.01, 3000), index=pd.bdate_range('2000-01-03', periods=3000))
+    returns.iloc[500:530] = returns.iloc[2970:3000].to_numpy() * 1.5 + 0.001
+    returns.iloc[1000:1040] = 0.0
+    returns.iloc[10] = np.nan
+    return returns
+
+
+def reference_similar_periods(current_returns, historical_returns, window, threshold):
+    """Positional Series.corr scan, as identify_similar_market_periods is specified"""
+    pattern = pd.Series(current_returns.tail(window).to_numpy())
+    periods = []
+    for i in range(window, len(historical_returns) - window):
+        correlation = pattern.corr(pd.Series(historical_returns.iloc[i-window:i].to_numpy()))
+        if correlation > threshold:
+            periods.append((historical_returns.index[i-window], correlation))
+    return sorted(periods, key=lambda x: x[1], reverse=True)
+
+
+def reference_regime(ret_mean, vol, vol_low, vol_high):
+    """Regime of one point, classified as detect_market_regimes is specified"""
+    if ret_mean > 0.0:
+        if vol < vol_low:
+            return 'bull_low_vol'
+        elif vol > vol_high:
+            return 'bull_high_vol'
+        return 'bull'
+    if vol < vol_low:
+        return 'bear_low_vol'
+    elif vol > vol_high:
+        return 'bear_high_vol'
+    return 'bear'
+
+
+def reference_market_regimes(returns, window):
+    """Date-by-date regime scan over pandas rolling statistics"""
+    rolling_returns = returns.rolling(window).mean()
+    rolling_vol = returns.rolling(window).std()
+    vol_low = rolling_vol.quantile(0.33)
+    vol_high = rolling_vol.quantile(0.67)
+
+    regimes = []
+    current_regime = regime_start = None
+    for date, ret_mean in rolling_returns.dropna().items():
+        vol = rolling_vol.loc[date]
+        regime_type = reference_regime(ret_mean, vol, vol_low, vol_high)
+        if current_regime != regime_type:
+            if current_regime is not None:
+                regime_returns = returns[regime_start:date]
+                regimes.append((current_regime, regime_start, date, regime_returns.mean(),
+                                regime_returns.std(), len(regime_returns),
+                                'high' if vol > vol_high else 'low' if vol < vol_low else 'medium'))
+            current_regime = regime_type
+            regime_start = date
+    return regimes
+
+
+def reference_return_statistics(returns):
+    """The _return_statistics tuple from pandas and scipy.stats"""
+    returns = pd.Series(returns)
+    cumulative = (1 + returns).cumprod()
+    rolling_max = cumulative.expanding().max()
+    wins = returns[returns > 0]
+    losses = returns[returns < 0]
+    return (returns.mean(), returns.std(), losses.std(), stats.skew(returns), stats.kurtosis(returns),
+            (1 + returns).prod() - 1, ((cumulative - rolling_max) / rolling_max).min(),
+            len(wins), wins.sum(), len(losses), losses.sum())
+
+
+@pytest.fixture
+def asset_returns():
+    """Four assets of daily returns, one of them flat for a stretch"""
+    rng = np.random.default_rng(11)
+    returns = pd.DataFrame(rng.normal(0.0003, 0.012, (400, 4)), columns=['a', 'b', 'c', 'd'],
+                           index=pd.bdate_range('2010-01-04', periods=400))
+    returns['b'] += 0.6 * returns['a']
+    returns.iloc[150:260, 2] = 0.0005
+    return returns
+
+
+class TestRollingCorrelations:
+    """Test the prefix-sum rolling correlations against DataFrame.corr"""
+
+    @staticmethod
+    def reference(returns_df, window, iu):
+        return np.array([returns_df.iloc[i-window:i].corr().to_numpy()[iu]
+                         for i in range(window, len(returns_df))])
+
+    def test_matches_dataframe_corr_with_flat_windows(self, asset_returns):
+        """Test every window, including those where one asset doesn't move"""
+        iu = _upper_triangle(asset_returns.shape[1])
+
+        expected = self.reference(asset_returns, 60, iu)
+        result = _rolling_upper_correlations(asset_returns, 60, iu)
+
+        assert np.isnan(expected).any()
+        np.testing.assert_array_equal(np.isnan(result), np.isnan(expected))
+        np.testing.assert_allclose(result, expected, rtol=1e-9, atol=1e-12, equal_nan=True)
+
+    @pytest.mark.parametrize("move", [1e-4, 1e-5])
+    def test_matches_dataframe_corr_with_nearly_flat_windows(self, asset_returns, move):
+        """Test windows where an asset sits at its mean but for one small move"""
+        asset_returns.iloc[150:260, 2] = asset_returns['c'].mean()
+        asset_returns.iloc[170, 2] += move
+        iu = _upper_triangle(asset_returns.shape[1])
+
+        np.testing.assert_allclose(_rolling_upper_correlations(asset_returns, 60, iu),
+                                   self.reference(asset_returns, 60, iu), rtol=1e-9, atol=1e-12, equal_nan=True)
+
+    def test_matches_dataframe_corr_with_gaps(self, asset_returns):
+        """Test that missing returns get pairwise-complete correlations"""
+        asset_returns.iloc[[5, 90, 91, 300], [0, 3, 1, 2]] = np.nan
+        iu = _upper_triangle(asset_returns.shape[1])
+
+        np.testing.assert_allclose(_rolling_upper_correlations(asset_returns, 60, iu),
+                                   self.reference(asset_returns, 60, iu), rtol=1e-12, equal_nan=True)
+
+    def test_short_history(self, asset_returns):
+        """Test that fewer rows than the window give no windows"""
+        iu = _upper_triangle(asset_returns.shape[1])
+
+        assert _rolling_upper_correlations(asset_returns.iloc[:60], 60, iu).shape == (0, len(iu[0]))
+
+
+class TestSlidingCorrelations:
+    """Test the prefix-sum similarity scan"""
+
+    def test_matches_series_corr_with_gaps_and_flat_windows(self, history):
+        """Test every window against pandas, including gapped and constant ones"""
+        series = history.to_numpy()
+        pattern = history.tail(30).to_numpy()
+
+        expected = np.array([pd.Series(series[k:k+30]).corr(pd.Series(pattern))
+                             for k in range(len(series) - 29)])
+        result = _sliding_correlations(series, pattern)
+
+        np.testing.assert_array_equal(np.isnan(result), np.isnan(expected))
+        np.testing.assert_allclose(result, expected, rtol=1e-9, atol=1e-12, equal_nan=True)
+
+    def test_gapped_pattern(self, history):
+        """Test that a gap in the pattern falls back to pairwise-complete correlations"""
+        series = history.to_numpy()[:400]
+        pattern = history.tail(30).to_numpy().copy()
+        pattern[3] = np.nan
+
+        expected = np.array([pd.Series(series[k:k+30]).corr(pd.Series(pattern))
+                             for k in range(len(series) - 29)])
+
+        np.testing.assert_allclose(_sliding_correlations(series, pattern), expected, rtol=1e-12, equal_nan=True)
+
+    @pytest.mark.parametrize("dtype", [np.float64, np.float32])
+    @pytest.mark.parametrize("value", [0.0, 0.001])
+    def test_flat_pattern(self, history, dtype, value):
+        """Test that a constant pattern correlates with nothing"""
+        series = history.to_numpy()[:400]
+
+        assert np.isnan(_sliding_correlations(series, np.full(30, value), dtype=dtype)).all()
+
+    @pytest.mark.parametrize("dtype, rtol, atol", [(np.float64, 1e-9, 1e-12), (np.float32, 0.0, 1e-5)],
+                             ids=['float64', 'float32'])
+    @pytest.mark.parametrize("seed", range(5))
+    def test_matches_series_corr_on_random_returns(self, seed, dtype, rtol, atol):
+        """Test random returns with scattered gaps and a stretch of nearly stale prices"""
+        rng = np.random.default_rng(seed)
+        series = rng.normal(0.0, 0.01, 600)
+        series[rng.integers(0, 600, 8)] = np.nan
+        start = rng.integers(0, 550)
+        series[start:start + 45] = 0.0
+        series[start + 30] = 1e-5
+        pattern = rng.normal(0.0, 0.01, 20)
+
+        expected = np.array([pd.Series(series[k:k+20]).corr(pd.Series(pattern))
+                             for k in range(len(series) - 19)])
+
+        np.testing.assert_allclose(_sliding_correlations(series, pattern, dtype=dtype), expected,
+                                   rtol=rtol, atol=atol, equal_nan=True)
+
+    def test_similar_periods_with_gap_in_history(self, history):
+        """Test that one missing return doesn't hide the windows around it"""
+        analytics = PortfolioAnalytics()
+        current = history.iloc[-100:]
+
+        expected = reference_similar_periods(current, history, 30, 0.3)
+        result = analytics.identify_similar_market_periods(current, history, window=30, similarity_threshold=0.3)
+
+        assert len(expected) > 0
+        assert sorted(p['start_date'] for p in result) == sorted(start for start, _ in expected)
+        assert result[0]['start_date'] == history.index[500]
+
+    @pytest.mark.parametrize("gap", [False, True])
+    def test_float32_matches_float64(self, history, gap):
+        """Test that the single-precision scan finds the same periods with the same scores"""
+        if not gap:
+            history = history.fillna(0.0)
+        analytics = PortfolioAnalytics()
+        current = history.iloc[-100:]
+        threshold = 0.3
+
+        exact = analytics.identify_similar_market_periods(current, history, window=30, similarity_threshold=threshold)
+        fast = analytics.identify_similar_market_periods(current, history, window=30, similarity_threshold=threshold,
+                                                         dtype=np.float32)
+
+        # Periods scoring within float32 rounding of the threshold may land either side
+        exact_scores = {p['start_date']: p['similarity_score'] for p in exact}
+        fast_scores = {p['start_date']: p['similarity_score'] for p in fast}
+        borderline = {d for d, score in {**exact_scores, **fast_scores}.items() if abs(score - threshold) < 1e-5}
+        assert len(exact_scores) > 100
+        assert set(exact_scores) - borderline == set(fast_scores) - borderline
+        for start in set(exact_scores) & set(fast_scores):
+            assert fast_scores[start] == pytest.approx(exact_scores[start], abs=1e-5)
+
+
+class TestRegimeClassification:
+    """Test the regime kernels against the date-by-date classification"""
+
+    @pytest.mark.parametrize("classify", [_classify_regimes, _classify_regimes_loop, _classify_regimes_numpy],
+                             ids=['compiled', 'loop', 'numpy'])
+    def test_matches_reference_with_ties_and_gaps(self, classify):
+        """Test codes and change points, including values on the thresholds and NaNs"""
+        rng = np.random.default_rng(3)
+        mean_returns = rng.normal(0.0, 0.001, 2000)
+        volatility = rng.uniform(0.005, 0.02, 2000)
+        vol_low, vol_high = 0.01, 0.015
+        mean_returns[::7] = 0.0
+        volatility[::5] = vol_low
+        volatility[1::5] = vol_high
+        mean_returns[[40, 41, 900]] = np.nan
+        volatility[[41, 42, 1500]] = np.nan
+
+        expected = [reference_regime(m, v, vol_low, vol_high) for m, v in zip(mean_returns, volatility)]
+        codes, changes = classify(mean_returns, volatility, vol_low, vol_high, 0.0)
+
+        assert [_REGIME_TYPES[code] for code in codes] == expected
+        assert changes.tolist() == [i for i in range(1, len(expected)) if expected[i] != expected[i - 1]]
+
+    def test_detect_market_regimes_matches_reference(self, history):
+        """Test regime spans and statistics on history with a gap and a flat stretch"""
+        analytics = PortfolioAnalytics()
+
+        expected = reference_market_regimes(history, 60)
+        result = analytics.detect_market_regimes(history, window=60)
+
+        assert len(result) == len(expected) > 10
+        for regime, (regime_type, start, end, mean, std, duration, vol_level) in zip(result, expected):
+            assert (regime.regime_type, regime.start_date, regime.end_date, regime.volatility_level) == \
+                (regime_type, start, end, vol_level)
+            assert regime.return_characteristics['duration_days'] == duration
+            assert regime.return_characteristics['mean_return'] == pytest.approx(mean, rel=1e-12)
+            assert regime.return_characteristics['volatility'] == pytest.approx(std, rel=1e-12)
+
+
+class TestReturnStatistics:
+    """Test the fused return statistics against pandas and scipy.stats"""
+
+    KERNELS = pytest.mark.parametrize("statistics", [_return_statistics, _return_statistics_loop,
+                                                      _return_statistics_numpy], ids=['compiled', 'loop', 'numpy'])
+
+    @staticmethod
+    def assert_matches(result, expected):
+        assert result[7] == expected[7] and result[9] == expected[9]
+        np.testing.assert_allclose(np.array(result, dtype=float), np.array(expected, dtype=float),
+                                   rtol=1e-9, atol=1e-15, equal_nan=True)
+
+    @KERNELS
+    @pytest.mark.parametrize("seed", range(5))
+    def test_random_returns(self, statistics, seed):
+        """Test heavy-tailed returns with exact zeros"""
+        rng = np.random.default_rng(seed)
+        returns = rng.standard_t(3, 500) * 0.01
+        returns[rng.integers(0, 500, 20)] = 0.0
+
+        self.assert_matches(statistics(returns), reference_return_statistics(returns))
+
+    @KERNELS
+    def test_gapped_history(self, statistics, history):
+        """Test history with its gap dropped, as calculate_comprehensive_metrics does"""
+        returns = history.dropna().to_numpy()
+
+        self.assert_matches(statistics(returns), reference_return_statistics(returns))
+
+    def test_compiled_keeps_nan_semantics(self, history):
+        """Test that the compiled kernel treats gaps exactly as its Python loop does"""
+        returns = history.to_numpy()
+
+        np.testing.assert_equal(_return_statistics(returns), _return_statistics_loop(returns))
+
+    @KERNELS
+    @pytest.mark.parametrize("value", [0.0, 0.001, -0.002])
+    @pytest.mark.filterwarnings("ignore::RuntimeWarning")
+    def test_constant_returns(self, statistics, value):
+        """Test that zero variance gives NaN moments, as scipy does"""
+        returns = np.full(60, value)
+
+        self.assert_matches(statistics(returns), reference_return_statistics(returns))
+
+    @KERNELS
+    def test_single_loss(self, statistics):
+        """Test that one negative return leaves the downside deviation undefined"""
+        returns = np.abs(np.random.default_rng(8).normal(0.0, 0.01, 40))
+        returns[17] = -0.03
+
+        self.assert_matches(statistics(returns), reference_return_statistics(returns))
+
+
+class TestValueAtRisk:
+    """Test the partition-based VaR and CVaR against np.percentile"""
+
+    @staticmethod
+    def assert_matches(returns, percentile):
+        var, cvar = _value_at_risk(returns, percentile)
+        expected_var = np.percentile(returns, percentile)
+
+        # The tail is summed in partition order, so CVaR may differ in the last bits
+        assert var == expected_var
+        assert cvar == pytest.approx(returns[returns <= expected_var].mean(), rel=1e-12)
+
+    @pytest.mark.parametrize("percentile", [0.0, 1.0, 5.0, 12.5, 50.0, 100.0])
+    @pytest.mark.parametrize("n", [1, 2, 7, 30, 251, 1000])
+    def test_matches_percentile(self, n, percentile):
+        """Test random returns of assorted lengths, including the extreme percentiles"""
+        returns = np.random.default_rng(n).standard_t(4, n) * 0.01
+
+        self.assert_matches(returns, percentile)
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_ties(self, seed):
+        """Test returns rounded to basis points, so many tie at VaR"""
+        rng = np.random.default_rng(seed)
+        returns = np.round(rng.normal(0.0, 0.002, rng.integers(30, 300)), 4)
+
+        self.assert_matches(returns, 5)
+
+    def test_constant_returns(self):
+        """Test that zero dispersion gives the constant for both VaR and CVaR"""
+        returns = np.full(60, -0.001)
+
+        assert _value_at_risk(returns, 5) == (-0.001, -0.001)
+
+    def test_gapped_history(self, history):
+        """Test history with its gap dropped, as calculate_comprehensive_metrics does"""
+        returns = history.dropna().to_numpy()
+
+        self.assert_matches(returns, 5)
+
+
+class TestMaxDrawdown:
+    """Test the array drawdown against the pandas expanding-max version"""
+
+    @staticmethod
+    def reference(returns):
+        cumulative = (1 + returns).cumprod()
+        rolling_max = cumulative.expanding().max()
+        return ((cumulative - rolling_max) / rolling_max).min()
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_matches_expanding_max(self, seed):
+        """Test random returns with gaps"""
+        rng = np.random.default_rng(seed)
+        returns = pd.Series(rng.normal(0.0002, 0.015, 500))
+        returns[rng.integers(0, 500, 10)] = np.nan
+
+        assert PortfolioAnalytics()._calculate_max_drawdown(returns) == pytest.approx(self.reference(returns),
+                                                                                        rel=1e-12)
+
+    @pytest.mark.parametrize("returns", [[0.01, 0.02, 0.0], [0.0] * 5, [np.nan, np.nan]])
+    def test_no_drawdown_and_no_data(self, returns):
+        """Test rising and flat series, which never draw down, and all-missing ones"""
+        returns = pd.Series(returns)
+
+        np.testing.assert_equal(PortfolioAnalytics()._calculate_max_drawdown(returns), self.reference(returns))